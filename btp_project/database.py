@@ -0,0 +1,68 @@
+"""
+Build the DATABASES setting from a DATABASE_URL.
+
+Supported schemes:
+    postgres://, postgresql://, pgsql://   PostgreSQL (psycopg)
+    sqlite:///relative/path, sqlite:////absolute/path
+
+Query string options (all optional):
+    conn_max_age        seconds a connection is kept open between requests
+    statement_timeout   PostgreSQL per-statement timeout in milliseconds
+    connect_timeout     seconds to wait when opening a connection
+    pooler=pgbouncer    running behind PgBouncer in transaction mode (PgBouncer must list
+                        `options` in ignore_startup_parameters, or set statement_timeout
+                        on the database role instead)
+    any other key       passed to the driver as a connection option (e.g. sslmode=require)
+"""
+
+from urllib.parse import urlparse, parse_qsl, unquote
+
+POSTGRES_SCHEMES = {'postgres', 'postgresql', 'pgsql'}
+
+
+def parse_database_url(url, conn_max_age=60, statement_timeout=30000, base_dir=None):
+    """Return a Django database configuration dict for the given URL."""
+    parsed = urlparse(url)
+    options = dict(parse_qsl(parsed.query))
+    conn_max_age = int(options.pop('conn_max_age', conn_max_age))
+
+    if parsed.scheme == 'sqlite':
+        # sqlite:///db.sqlite3 is relative to the project, sqlite:////srv/db.sqlite3 is absolute
+        name = unquote(parsed.path)[1:]
+        if base_dir is not None and not name.startswith('/'):
+            name = str(base_dir / name)
+        return {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': name,
+            'CONN_MAX_AGE': conn_max_age,
+            'CONN_HEALTH_CHECKS': True,
+        }
+
+    if parsed.scheme not in POSTGRES_SCHEMES:
+        raise ValueError(f"Unsupported DATABASE_URL scheme: {parsed.scheme}")
+
+    statement_timeout = int(options.pop('statement_timeout', statement_timeout))
+    behind_pooler = options.pop('pooler', '') == 'pgbouncer'
+    driver_options = {
+        'connect_timeout': int(options.pop('connect_timeout', 5)),
+        # Abort runaway queries server-side instead of tying up a worker
+        'options': f'-c statement_timeout={statement_timeout}',
+        **options,
+    }
+
+    config = {
+        'ENGINE': 'django.db.backends.postgresql',
+        'NAME': unquote(parsed.path.lstrip('/')),
+        'USER': unquote(parsed.username or ''),
+        'PASSWORD': unquote(parsed.password or ''),
+        'HOST': parsed.hostname or '',
+        'PORT': str(parsed.port or ''),
+        'CONN_MAX_AGE': conn_max_age,
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': driver_options,
+    }
+    if behind_pooler:
+        # PgBouncer transaction pooling shares server connections between clients,
+        # so named server-side cursors (used by .iterator()) cannot be kept open
+        config['DISABLE_SERVER_SIDE_CURSORS'] = True
+    return config
@@ -37,7 +37,10 @@ class AppointmentAdmin(admin.ModelAdmin):
 @admin.register(SentEmail)
 class SentEmailAdmin(admin.ModelAdmin):
     """Admin interface for sent follow-up emails."""
-    list_display = ("recipient_email", "subject", "sent_at", "sent_by")
-    list_filter = ("sent_at",)
+    list_display = ("recipient_email", "subject", "status", "attempts", "created_at", "sent_at", "sent_by")
+    list_filter = ("status", "created_at")
     search_fields = ("recipient_email", "subject", "body")
-    readonly_fields = ("appointment", "subject", "body", "recipient_email", "sent_at", "sent_by")
+    readonly_fields = (
+        "appointment", "subject", "body", "recipient_email", "created_at", "sent_at", "sent_by",
+        "attempts", "next_attempt_at", "last_error",
+    )
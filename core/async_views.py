@@ -0,0 +1,84 @@
+"""
+Async versions of the availability and booking API views, served under ASGI.
+
+btp_project/asgi.py turns on settings.ASYNC_VIEWS, and core/urls.py then routes the API
+to these views instead of their sync versions in core/views.py (request parsing and
+responses are shared with them). While a calendar client waits on the cache or the
+database, the event loop serves the others, so one uvicorn worker holds many clients.
+
+Django 4.2's view decorators (require_http_methods, condition, cache_control) are not
+async-aware, so their behaviour is reproduced here. Transactions have no async API yet:
+the reservation itself runs in a worker thread through sync_to_async.
+"""
+
+import logging
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponseNotAllowed, JsonResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+
+from .availability import aavailability_etag, aget_availability_range
+from .models import Appointment
+from .ratelimit import ratelimit
+from .reservations import SlotTaken, reserve_appointment
+from .views import _booked, _booking_errors, _booking_form, _new_appointment, _slots_payload, _slots_query
+
+logger = logging.getLogger(__name__)
+
+
+async def _auser(request):
+    """request.user, loaded from the session in a thread (Django 4.2 has no request.auser())."""
+    def load():
+        user = request.user
+        user.is_authenticated  # Resolves the lazy object
+        return user
+    return await sync_to_async(load)()
+
+
+@ratelimit('slots')
+async def get_available_slots(request):
+    """Async version of views.get_available_slots (same query params, ETag and responses)."""
+    if request.method != 'GET':
+        return HttpResponseNotAllowed(['GET'])
+
+    query = _slots_query(request)
+    etag = None
+    if not isinstance(query, JsonResponse) and query['type'] in dict(Appointment.APPOINTMENT_TYPE_CHOICES):
+        etag = quote_etag(await aavailability_etag(query['type'], query['start'], query['end']))
+
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        if isinstance(query, JsonResponse):
+            response = query
+        else:
+            try:
+                days = await aget_availability_range(query['type'], query['start'], query['end']) if query['start'] <= query['end'] else {}
+                response = JsonResponse(_slots_payload(request, query, days))
+            except Exception as e:
+                logger.error("Error fetching available slots", extra={'error': str(e)})
+                response = JsonResponse({'error': 'Une erreur s\'est produite.'}, status=500)
+    if etag:
+        response.headers.setdefault('ETag', etag)
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@ratelimit('booking')
+async def book_appointment(request):
+    """Async version of views.book_appointment."""
+    if request.method != 'POST':
+        return HttpResponseNotAllowed(['POST'])
+
+    form = _booking_form(request)
+    if isinstance(form, JsonResponse):
+        return form
+    # Model validation may query the database: run it in a thread
+    if not await sync_to_async(form.is_valid)():
+        return _booking_errors(form)
+    appointment = _new_appointment(form, await _auser(request))
+    try:
+        await sync_to_async(reserve_appointment)(appointment)
+    except SlotTaken as e:
+        return JsonResponse(e.as_dict(), status=409)
+    return _booked(appointment)
@@ -0,0 +1,50 @@
+"""
+Authentication backend serving the logged-in user from the cache.
+
+AuthenticationMiddleware loads request.user through the backend on every request. With
+CachedModelBackend the user row is read once and then kept in the cache for
+USER_CACHE_TIMEOUT seconds; saving or deleting the user (profile edits, password changes,
+last_login updates) or logging out drops it, now and once the transaction commits.
+Together with the cached_db session engine, a logged-in page view needs no query for
+authentication.
+
+The session hash is still checked against the cached user, so a password change logs out
+the other sessions as soon as the entry is dropped. Every worker must see that: settings
+only enable this backend (and cached_db sessions) with the shared Redis cache.
+"""
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.db import transaction
+
+USER_CACHE_TIMEOUT = getattr(settings, 'USER_CACHE_TIMEOUT', 300)
+
+
+def user_cache_key(user_id):
+    return f"auth:user:{user_id}"
+
+
+def invalidate_user(user_id):
+    """Drop the cached user, now and once the current transaction commits."""
+    def drop():
+        cache.delete(user_cache_key(user_id))
+
+    drop()
+    transaction.on_commit(drop)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend whose get_user() reads the cache first."""
+
+    def get_user(self, user_id):
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = get_user_model()._default_manager.get(pk=user_id)
+            except get_user_model().DoesNotExist:
+                return None
+            cache.set(key, user, USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,258 @@
+"""
+Availability computation for the booking calendar.
+
+Per-(type, date) availability is cached through Django's cache framework. Each day has a
+version token; cached entries are stored under the current token and invalidation simply
+replaces the token, so an entry computed from a stale read can never be served again.
+That only holds if every worker sees the replaced token: with a per-process cache
+(settings.SHARED_CACHE off) availability and its ETags are computed from the database.
+
+The a-prefixed functions are the async versions used by the ASGI views (core/async_views.py).
+"""
+
+from datetime import date, timedelta
+import hashlib
+import uuid
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .cache_backends import cache_is_shared
+from .models import Appointment
+from .slots import get_calendar
+
+# Length of a booking made from the calendar (the model default)
+BOOKING_DURATION_MINUTES = Appointment._meta.get_field('duration_hours').default * 60
+
+# Maximum span in days of a single range request (3-month booking window)
+MAX_RANGE_DAYS = 92
+
+# Lifetime of a cached day; invalidation is explicit so this only bounds memory use
+AVAILABILITY_CACHE_TIMEOUT = getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 3600)
+
+# Version tokens outlive the entries stored under them; an expired token is simply
+# replaced by a new one, which only makes the day be computed again
+VERSION_TIMEOUT = AVAILABILITY_CACHE_TIMEOUT * 2
+
+
+def _bookings_query(appointment_type, start_date, end_date):
+    return Appointment.objects.filter(
+        appointment_type=appointment_type,
+        appointment_date__range=(start_date, end_date),
+        status__in=Appointment.BLOCKING_STATUSES,
+    ).values_list('appointment_date', 'appointment_time', 'duration_hours')
+
+
+def get_bookings(appointment_type, start_date, end_date):
+    """
+    Return (date, time, duration_hours) of every blocking appointment in an inclusive date range.
+
+    Uses a single indexed range query over (appointment_date, appointment_time) for the whole range.
+    """
+    return list(_bookings_query(appointment_type, start_date, end_date))
+
+
+async def aget_bookings(appointment_type, start_date, end_date):
+    """Async version of get_bookings()."""
+    return [row async for row in _bookings_query(appointment_type, start_date, end_date)]
+
+
+def _version_key(appointment_type, appointment_date):
+    return f"availability:v:{appointment_type}:{appointment_date.isoformat()}"
+
+
+def _data_key(appointment_type, appointment_date, version):
+    fingerprint = get_calendar().fingerprint
+    return f"availability:{appointment_type}:{appointment_date.isoformat()}:{fingerprint}:{version}"
+
+
+async def _aget_many(keys):
+    # Django 4.2's async cache methods make one sync_to_async() call per key; one call per
+    # batch is much cheaper. Cache clients are thread-safe: no need for the ORM's thread.
+    return await sync_to_async(cache.get_many, thread_sensitive=False)(keys)
+
+
+async def _aset_many(data, timeout):
+    return await sync_to_async(cache.set_many, thread_sensitive=False)(data, timeout)
+
+
+def _resolve_versions(keys, found):
+    """Split {date: version key} into the versions found and new tokens for the missing ones."""
+    versions = {}
+    missing = {}
+    for day, key in keys.items():
+        if key in found:
+            versions[day] = found[key]
+        else:
+            versions[day] = missing[key] = uuid.uuid4().hex
+    return versions, missing
+
+
+def _get_versions(appointment_type, dates):
+    """Return the current cache version token of each date, creating missing ones."""
+    keys = {day: _version_key(appointment_type, day) for day in dates}
+    versions, missing = _resolve_versions(keys, cache.get_many(keys.values()))
+    if missing:
+        cache.set_many(missing, VERSION_TIMEOUT)
+    return versions
+
+
+async def _aget_versions(appointment_type, dates):
+    """Async version of _get_versions()."""
+    keys = {day: _version_key(appointment_type, day) for day in dates}
+    versions, missing = _resolve_versions(keys, await _aget_many(keys.values()))
+    if missing:
+        await _aset_many(missing, VERSION_TIMEOUT)
+    return versions
+
+
+def _split_range(start_date, end_date):
+    """Return the closed days of an inclusive range (with their entry) and its open dates."""
+    calendar = get_calendar()
+    closed = {}
+    open_dates = []
+    current = start_date
+    while current <= end_date:
+        if not calendar.is_open_day(current):
+            closed[current] = {'available_slots': [], 'closed': True, 'full': False}
+        else:
+            open_dates.append(current)
+        current += timedelta(days=1)
+    return closed, open_dates
+
+
+def _days_from_bookings(appointment_type, dates, bookings):
+    """Availability of the given open dates, given every booking between the first and last."""
+    calendar = get_calendar()
+    free = calendar.free_slots(appointment_type, min(dates), max(dates), bookings, BOOKING_DURATION_MINUTES)
+
+    days = {}
+    for day in dates:
+        slots = [calendar.format_slot(slot, BOOKING_DURATION_MINUTES) for slot in free[day]]
+        days[day] = {'available_slots': slots, 'closed': False, 'full': not slots}
+    return days
+
+
+def _compute_days(appointment_type, dates):
+    """Compute availability for the given open dates from a single query."""
+    return _days_from_bookings(appointment_type, dates, get_bookings(appointment_type, min(dates), max(dates)))
+
+
+async def _acompute_days(appointment_type, dates):
+    """Async version of _compute_days()."""
+    return _days_from_bookings(appointment_type, dates, await aget_bookings(appointment_type, min(dates), max(dates)))
+
+
+def invalidate_availability(appointment_type, appointment_date):
+    """
+    Drop cached availability for one (type, date).
+
+    The version is replaced immediately and again once the current transaction commits,
+    so readers that computed the day from pre-commit data cannot repopulate the cache.
+    """
+    invalidate_availability_days([(appointment_type, appointment_date)])
+
+
+def invalidate_availability_days(days):
+    """Drop cached availability for many (type, date) pairs with one cache write."""
+    keys = {_version_key(appointment_type, appointment_date) for appointment_type, appointment_date in days}
+    if not keys:
+        return
+
+    def bump():
+        cache.set_many({key: uuid.uuid4().hex for key in keys}, VERSION_TIMEOUT)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def availability_etag(appointment_type, start_date, end_date):
+    """
+    Return an ETag for the availability of a date range without touching the database.
+
+    Built from the version token of every open day (one cache read), the calendar
+    fingerprint and today's date, so any booking change, calendar change or day rollover
+    produces a new tag. Without a shared cache the tag is built from the bookings
+    themselves (one query), as other workers' tokens would not change.
+    """
+    open_dates = _split_range(start_date, end_date)[1]
+    if not open_dates:
+        return _etag(appointment_type, open_dates, {})
+    if not cache_is_shared():
+        return _etag(appointment_type, open_dates, {}, get_bookings(appointment_type, min(open_dates), max(open_dates)))
+    return _etag(appointment_type, open_dates, _get_versions(appointment_type, open_dates))
+
+
+async def aavailability_etag(appointment_type, start_date, end_date):
+    """Async version of availability_etag()."""
+    open_dates = _split_range(start_date, end_date)[1]
+    if not open_dates:
+        return _etag(appointment_type, open_dates, {})
+    if not cache_is_shared():
+        return _etag(appointment_type, open_dates, {}, await aget_bookings(appointment_type, min(open_dates), max(open_dates)))
+    return _etag(appointment_type, open_dates, await _aget_versions(appointment_type, open_dates))
+
+
+def _etag(appointment_type, open_dates, versions, bookings=()):
+    parts = [appointment_type, get_calendar().fingerprint, date.today().isoformat()]
+    parts += [f"{day.isoformat()}={versions.get(day, '')}" for day in open_dates]
+    parts += [f"{day.isoformat()}T{start}+{hours}" for day, start, hours in sorted(bookings)]
+    return hashlib.md5(':'.join(parts).encode()).hexdigest()
+
+
+def get_availability_range(appointment_type, start_date, end_date):
+    """
+    Return availability for every day between start_date and end_date (inclusive).
+
+    Returns a dict keyed by date with 'available_slots', 'closed' and 'full' entries.
+    Weekends, holidays and closures are reported as closed without any slot. Days found in
+    the cache cost no database query; the remaining ones are computed together and cached
+    (all of them, uncached, without a shared cache).
+    """
+    days, open_dates = _split_range(start_date, end_date)
+    if not open_dates:
+        return days
+    if not cache_is_shared():
+        return dict(sorted({**days, **_compute_days(appointment_type, open_dates)}.items()))
+
+    versions = _get_versions(appointment_type, open_dates)
+    keys = {day: _data_key(appointment_type, day, versions[day]) for day in open_dates}
+    cached = cache.get_many(keys.values())
+
+    missing = [day for day in open_dates if keys[day] not in cached]
+    computed = _compute_days(appointment_type, missing) if missing else {}
+    if computed:
+        cache.set_many({keys[day]: info for day, info in computed.items()}, AVAILABILITY_CACHE_TIMEOUT)
+    return _merge_days(days, open_dates, keys, cached, computed)
+
+
+async def aget_availability_range(appointment_type, start_date, end_date):
+    """
+    Async version of get_availability_range(), for the ASGI views.
+
+    Cache reads/writes and the bookings query are awaited, so the event loop keeps serving
+    other calendar clients meanwhile.
+    """
+    days, open_dates = _split_range(start_date, end_date)
+    if not open_dates:
+        return days
+    if not cache_is_shared():
+        return dict(sorted({**days, **(await _acompute_days(appointment_type, open_dates))}.items()))
+
+    versions = await _aget_versions(appointment_type, open_dates)
+    keys = {day: _data_key(appointment_type, day, versions[day]) for day in open_dates}
+    cached = await _aget_many(keys.values())
+
+    missing = [day for day in open_dates if keys[day] not in cached]
+    computed = await _acompute_days(appointment_type, missing) if missing else {}
+    if computed:
+        await _aset_many({keys[day]: info for day, info in computed.items()}, AVAILABILITY_CACHE_TIMEOUT)
+    return _merge_days(days, open_dates, keys, cached, computed)
+
+
+def _merge_days(days, open_dates, keys, cached, computed):
+    for day in open_dates:
+        days[day] = cached[keys[day]] if keys[day] in cached else computed[day]
+    return dict(sorted(days.items()))
@@ -0,0 +1,71 @@
+"""
+CSS/JS bundles built by collectstatic.
+
+settings.STATIC_BUNDLES maps a bundle path to its source files. The bundles are
+concatenated and minified into STATIC_ROOT before the manifest storage hashes and
+compresses them, so they get content-hashed names (cached forever) and .gz/.br copies.
+Bundles sit next to their sources (core/css, core/js) so relative url()s keep working.
+
+rcssmin and rjsmin are optional: without them bundles are only concatenated.
+"""
+
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+try:
+    import rcssmin
+except ImportError:
+    rcssmin = None
+
+try:
+    import rjsmin
+except ImportError:
+    rjsmin = None
+
+
+def get_bundles():
+    return getattr(settings, 'STATIC_BUNDLES', {})
+
+
+def minify(name, content):
+    """Minify CSS or JS source text when the minifier is installed."""
+    if name.endswith('.css') and rcssmin:
+        return rcssmin.cssmin(content)
+    if name.endswith('.js') and rjsmin:
+        return rjsmin.jsmin(content)
+    return content
+
+
+def build_bundle(storage, name, sources):
+    """Concatenate and minify `sources` from `storage` into bundle `name`."""
+    parts = []
+    for source in sources:
+        with storage.open(source) as f:
+            parts.append(minify(source, f.read().decode('utf-8')))
+    # A statement separator so a source without a trailing semicolon cannot merge into the next
+    separator = '\n' if name.endswith('.css') else ';\n'
+    if storage.exists(name):
+        storage.delete(name)
+    storage.save(name, ContentFile(separator.join(parts).encode('utf-8')))
+
+
+def build_bundles(storage, paths):
+    """
+    Build every bundle whose sources were collected and add it to `paths`.
+
+    `paths` is the {path: (storage, path)} dict collectstatic passes to post_process.
+    """
+    for name, sources in get_bundles().items():
+        if all(source in paths for source in sources):
+            build_bundle(storage, name, sources)
+            paths[name] = (storage, name)
+
+
+@lru_cache(maxsize=None)
+def bundle_is_built(name):
+    """Whether collectstatic produced this bundle (it is in the static manifest)."""
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    return name in getattr(staticfiles_storage, 'hashed_files', {})
@@ -0,0 +1,51 @@
+"""
+Cache backends counting hits and misses for the request metrics (core/metrics.py).
+
+They behave exactly like Django's Redis and local-memory backends; get() and get_many()
+also report their hits and misses to the request being served.
+"""
+
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.cache.backends.redis import RedisCache
+
+from .metrics import record_cache
+
+_MISSING = object()
+
+
+def cache_is_shared():
+    """Whether the default cache is seen by every worker (settings.SHARED_CACHE)."""
+    return getattr(settings, 'SHARED_CACHE', False)
+
+
+# Off while get_many() runs, as BaseCache.get_many() calls get() for each key
+_counting = ContextVar('cache_counting', default=True)
+
+
+class InstrumentedCacheMixin:
+    def get(self, key, default=None, version=None):
+        value = super().get(key, _MISSING, version=version)
+        if _counting.get():
+            record_cache(value is not _MISSING, value is _MISSING)
+        return default if value is _MISSING else value
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        token = _counting.set(False)
+        try:
+            found = super().get_many(keys, version=version)
+        finally:
+            _counting.reset(token)
+        record_cache(len(found), len(keys) - len(found))
+        return found
+
+
+class InstrumentedRedisCache(InstrumentedCacheMixin, RedisCache):
+    pass
+
+
+class InstrumentedLocMemCache(InstrumentedCacheMixin, LocMemCache):
+    pass
@@ -0,0 +1,20 @@
+"""System checks of the core application."""
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Tags, Warning, register
+
+
+@register(Tags.caches, deploy=True)
+def check_ratelimit_cache(app_configs, **kwargs):
+    """Rate-limit counters kept per process are not shared by the workers."""
+    alias = getattr(settings, 'RATELIMIT_CACHE', 'default')
+    if not isinstance(caches[alias], LocMemCache):
+        return []
+    return [Warning(
+        f"RATELIMIT_CACHE ('{alias}') is a per-process local-memory cache: each worker counts "
+        "requests separately, so every rate limit is multiplied by the number of workers.",
+        hint="Set REDIS_URL, or point RATELIMIT_CACHE at a cache shared by the workers (file or database).",
+        id='core.W001',
+    )]
@@ -0,0 +1,200 @@
+"""
+Project documents (PDF deliverables) shown on the livrables page.
+
+settings.PROJECT_DOCUMENTS maps a URL slug to a PDF on disk. The files are streamed
+with FileResponse, honouring single HTTP byte ranges so browser PDF viewers and download
+managers can fetch pieces and resume, instead of reading the whole file into memory.
+
+Page thumbnails are rendered once (by `build_document_previews`, or on the first request
+that needs them) into DOCUMENT_PREVIEW_ROOT, together with a small page index (page count,
+page sizes, thumbnail names). The index is cached, so the livrables page never opens a PDF.
+Previews are keyed by the file's size and mtime: replacing a PDF regenerates them.
+
+PyMuPDF is optional: without it documents are still served, without previews.
+"""
+
+import json
+import logging
+import os
+
+from django.conf import settings
+from django.core.cache import cache
+
+try:
+    import pymupdf
+except ImportError:
+    pymupdf = None
+
+logger = logging.getLogger(__name__)
+
+THUMBNAIL_WIDTH = 320  # px
+MAX_THUMBNAIL_PAGES = 12
+INDEX_CACHE_TIMEOUT = 24 * 3600
+
+
+class RangeNotSatisfiable(Exception):
+    """The Range header asks for bytes past the end of the file."""
+
+
+def pymupdf_available():
+    return pymupdf is not None
+
+
+def get_documents():
+    return getattr(settings, 'PROJECT_DOCUMENTS', {})
+
+
+def get_document(slug):
+    """Return the settings entry of a document whose file exists, or None."""
+    document = get_documents().get(slug)
+    if document is None or not os.path.isfile(document['path']):
+        return None
+    return document
+
+
+def fingerprint(path):
+    """Identify a version of a file without reading it."""
+    stat = os.stat(path)
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+def preview_dir(slug):
+    return os.path.join(settings.DOCUMENT_PREVIEW_ROOT, slug)
+
+
+def parse_range(header, size):
+    """
+    Return the inclusive (start, end) byte range of a Range header, or None to send the
+    whole file (no header, a malformed one, or several ranges, which we do not serve).
+    Raises RangeNotSatisfiable when the range starts past the end of the file.
+    """
+    if not header or not header.startswith('bytes=') or ',' in header:
+        return None
+    start, sep, end = header[len('bytes='):].strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if not start:
+            # Suffix range: the last N bytes
+            length = int(end)
+            if length <= 0:
+                raise RangeNotSatisfiable
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = int(end) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    if end < start:
+        return None
+    return start, min(end, size - 1)
+
+
+class FileRange:
+    """Read-only view of `length` bytes of an open file, from its current position."""
+
+    def __init__(self, file, length):
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _read_index(slug, version):
+    try:
+        with open(os.path.join(preview_dir(slug), 'index.json')) as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get('fingerprint') == version else None
+
+
+def build_preview(slug):
+    """Render the page thumbnails and page index of a document and return the index."""
+    document = get_document(slug)
+    if document is None or pymupdf is None:
+        return None
+
+    version = fingerprint(document['path'])
+    directory = preview_dir(slug)
+    os.makedirs(directory, exist_ok=True)
+    try:
+        pdf = pymupdf.open(document['path'])
+    except (RuntimeError, ValueError) as e:
+        logger.warning("Cannot open document", extra={'slug': slug, 'error': str(e)})
+        return None
+
+    with pdf:
+        pages = []
+        for number, page in enumerate(pdf, start=1):
+            entry = {'number': number, 'width': round(page.rect.width), 'height': round(page.rect.height)}
+            if number <= MAX_THUMBNAIL_PAGES:
+                zoom = THUMBNAIL_WIDTH / page.rect.width
+                pixmap = page.get_pixmap(matrix=pymupdf.Matrix(zoom, zoom), alpha=False)
+                entry['thumbnail'] = f"page-{number}.{version}.png"
+                entry['thumbnail_height'] = pixmap.height
+                pixmap.save(os.path.join(directory, entry['thumbnail']))
+            pages.append(entry)
+
+    # Thumbnails of previous versions of the file
+    current = {page['thumbnail'] for page in pages if 'thumbnail' in page}
+    for name in os.listdir(directory):
+        if name.endswith('.png') and name not in current:
+            os.remove(os.path.join(directory, name))
+
+    index = {
+        'fingerprint': version,
+        'size': os.path.getsize(document['path']),
+        'page_count': len(pages),
+        'pages': pages,
+    }
+    with open(os.path.join(directory, 'index.json'), 'w') as f:
+        json.dump(index, f)
+    cache.set(f"document:{slug}:{version}", index, INDEX_CACHE_TIMEOUT)
+    return index
+
+
+def get_preview(slug, build=True):
+    """
+    Return the page index of a document, from the cache, the preview directory or, if
+    `build`, by rendering it now. None when it cannot be produced.
+    """
+    document = get_document(slug)
+    if document is None:
+        return None
+    version = fingerprint(document['path'])
+    key = f"document:{slug}:{version}"
+    index = cache.get(key)
+    if index is None:
+        index = _read_index(slug, version)
+        if index is not None:
+            cache.set(key, index, INDEX_CACHE_TIMEOUT)
+        elif build:
+            index = build_preview(slug)
+    return index
+
+
+def document_list():
+    """The documents for the livrables page, with their page index when already built."""
+    documents = []
+    for slug, document in get_documents().items():
+        if get_document(slug) is None:
+            continue
+        preview = get_preview(slug, build=False)
+        documents.append({
+            'slug': slug,
+            'title': document['title'],
+            'size': os.path.getsize(document['path']),
+            'preview': preview,
+            'cover': preview['pages'][0] if preview and preview['pages'] and 'thumbnail' in preview['pages'][0] else None,
+        })
+    return documents
@@ -0,0 +1,165 @@
+"""
+Streaming CSV exports for the dashboard.
+
+Rows are read with values_list().iterator(chunk_size) and written in small chunks into a
+StreamingHttpResponse, so memory stays flat whatever the table size: no model instances
+are built and the full file is never held in memory.
+"""
+
+import csv
+
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from .models import Appointment, ContactMessage, SentEmail
+
+CHUNK_SIZE = 2000
+# Bytes of CSV gathered before handing a chunk to the server
+BUFFER_SIZE = 64 * 1024
+
+# Cells starting with these are evaluated as formulas by spreadsheet software
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+class Echo:
+    """File-like object whose write() returns the value instead of storing it."""
+
+    def write(self, value):
+        return value
+
+
+def _cell(value):
+    if value is None:
+        return ''
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def _lines(queryset, columns):
+    """Yield the CSV header then the rows, grouped in ~BUFFER_SIZE chunks; columns are (header, field, formatter)."""
+    writer = csv.writer(Echo())
+    # BOM so spreadsheet software opens the file as UTF-8 (accents in names)
+    buffer = ['\ufeff' + writer.writerow([header for header, field, formatter in columns])]
+    size = 0
+    fields = [field for header, field, formatter in columns]
+    formatters = [formatter for header, field, formatter in columns]
+    for row in queryset.values_list(*fields).iterator(chunk_size=CHUNK_SIZE):
+        line = writer.writerow([
+            _cell(formatter(value) if formatter and value is not None else value)
+            for formatter, value in zip(formatters, row)
+        ])
+        buffer.append(line)
+        size += len(line)
+        # One write per chunk instead of one per row
+        if size >= BUFFER_SIZE:
+            yield ''.join(buffer)
+            buffer, size = [], 0
+    yield ''.join(buffer)
+
+
+def _choices(choices):
+    labels = dict(choices)
+    return lambda value: labels.get(value, value)
+
+
+def _local(value):
+    return timezone.localtime(value).strftime('%Y-%m-%d %H:%M')
+
+
+APPOINTMENT_COLUMNS = [
+    ('ID', 'pk', None),
+    ('Type', 'appointment_type', _choices(Appointment.APPOINTMENT_TYPE_CHOICES)),
+    ('Nom', 'name', None),
+    ('Email', 'email', None),
+    ('Téléphone', 'phone', None),
+    ('Date', 'appointment_date', None),
+    ('Heure', 'appointment_time', lambda value: value.strftime('%H:%M')),
+    ('Durée (h)', 'duration_hours', None),
+    ('Sujet', 'subject', None),
+    ('Notes', 'notes', None),
+    ('Statut', 'status', _choices(Appointment.STATUS_CHOICES)),
+    ('Créé le', 'created_at', _local),
+]
+
+CONTACT_COLUMNS = [
+    ('ID', 'pk', None),
+    ('Nom', 'name', None),
+    ('Email', 'email', None),
+    ('Sujet', 'subject', None),
+    ('Message', 'message', None),
+    ('Reçu le', 'sent_at', _local),
+]
+
+SENT_EMAIL_COLUMNS = [
+    ('ID', 'pk', None),
+    ('Rendez-vous', 'appointment_id', None),
+    ('Destinataire', 'recipient_email', None),
+    ('Sujet', 'subject', None),
+    ('Message', 'body', None),
+    ('Statut', 'status', _choices(SentEmail.STATUS_CHOICES)),
+    ('Tentatives', 'attempts', None),
+    ('Créé le', 'created_at', _local),
+    ('Envoyé le', 'sent_at', _local),
+    ('Par', 'sent_by__username', None),
+]
+
+
+def _parse(value):
+    try:
+        return parse_date(value or '')
+    except ValueError:
+        return None
+
+
+def _date_range(queryset, field, params):
+    """Filter on params['from'] / params['to'] (YYYY-MM-DD, inclusive); bad dates are ignored."""
+    start, end = _parse(params.get('from')), _parse(params.get('to'))
+    if start:
+        queryset = queryset.filter(**{f'{field}__gte': start})
+    if end:
+        queryset = queryset.filter(**{f'{field}__lte': end})
+    return queryset
+
+
+def appointment_export(params):
+    """Appointments filtered like the dashboard (type, status) plus an optional date range."""
+    queryset = Appointment.objects.all()
+    if params.get('type') in dict(Appointment.APPOINTMENT_TYPE_CHOICES):
+        queryset = queryset.filter(appointment_type=params['type'])
+    if params.get('status') in dict(Appointment.STATUS_CHOICES):
+        queryset = queryset.filter(status=params['status'])
+    queryset = _date_range(queryset, 'appointment_date', params)
+    return queryset.order_by('-appointment_date', '-appointment_time', '-pk'), APPOINTMENT_COLUMNS
+
+
+def contact_export(params):
+    """Contact messages, optionally limited to a date range."""
+    queryset = _date_range(ContactMessage.objects.all(), 'sent_at__date', params)
+    return queryset.order_by('-pk'), CONTACT_COLUMNS
+
+
+def sent_email_export(params):
+    """Outbox emails, optionally filtered by status and date range."""
+    queryset = SentEmail.objects.all()
+    if params.get('status') in dict(SentEmail.STATUS_CHOICES):
+        queryset = queryset.filter(status=params['status'])
+    queryset = _date_range(queryset, 'created_at__date', params)
+    return queryset.order_by('-pk'), SENT_EMAIL_COLUMNS
+
+
+EXPORTS = {
+    'rendez-vous': appointment_export,
+    'messages': contact_export,
+    'emails': sent_email_export,
+}
+
+
+def csv_response(kind, params):
+    """Return a streaming CSV download of export `kind` (a key of EXPORTS)."""
+    queryset, columns = EXPORTS[kind](params)
+    filename = f"{kind}-{timezone.localdate().isoformat()}.csv"
+    response = StreamingHttpResponse(_lines(queryset, columns), content_type='text/csv; charset=utf-8')
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
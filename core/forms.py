@@ -2,6 +2,8 @@ from django import forms
 from django.contrib.auth.models import User
 from django.contrib.auth.forms import UserCreationForm
 from .models import ContactMessage, Appointment
+from .slots import get_calendar
+from django.template import Template, TemplateSyntaxError
 from datetime import datetime, timedelta
 
 
@@ -88,26 +90,33 @@ class AppointmentForm(forms.ModelForm):
             'notes': 'Notes',
         }
 
+    def __init__(self, *args, appointment_type=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.appointment_type = appointment_type
+        if appointment_type:
+            # Lets the model-level calendar checks run during form validation
+            self.instance.appointment_type = appointment_type
+        # Overlaps are checked by reserve_appointment(), which suggests the nearest free slots
+        self.instance.check_conflict = False
+
     def clean_appointment_date(self):
-        """Validate that appointment date is not in the past and is a weekday."""
+        """Validate that appointment date is not in the past and is an open day."""
         date = self.cleaned_data.get('appointment_date')
         if date:
             # Check if date is in the past
             if date < datetime.now().date():
                 raise forms.ValidationError("La date du rendez-vous ne peut pas être dans le passé.")
 
-            # Check if date is on weekend
-            if date.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-                raise forms.ValidationError("Les rendez-vous ne sont disponibles que du lundi au vendredi.")
+            # Check weekday, holidays and closures
+            get_calendar().validate_date(date)
 
         return date
 
     def clean_appointment_time(self):
-        """Validate that appointment time is within business hours."""
+        """Validate that appointment time is a slot within business hours."""
         time = self.cleaned_data.get('appointment_time')
         if time:
-            if time.hour < 9 or time.hour >= 16:
-                raise forms.ValidationError("Les rendez-vous sont disponibles de 9h à 16h.")
+            get_calendar().validate_time(self.appointment_type, time, self.instance.duration_minutes)
         return time
 
 
@@ -130,3 +139,84 @@ class FollowUpEmailForm(forms.Form):
             'placeholder': 'Votre message...',
         })
     )
+
+
+class BulkEmailForm(forms.Form):
+    """Form for emailing every appointment matching a filter from the dashboard."""
+
+    appointment_type = forms.ChoiceField(
+        label="Type",
+        required=False,
+        choices=[('', 'Tous')] + Appointment.APPOINTMENT_TYPE_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    status = forms.ChoiceField(
+        label="Statut",
+        required=False,
+        choices=[('', 'Tous')] + Appointment.STATUS_CHOICES,
+        widget=forms.Select(attrs={'class': 'form-control'}),
+    )
+    date_from = forms.DateField(
+        label="Du",
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+    )
+    date_to = forms.DateField(
+        label="Au",
+        required=False,
+        widget=forms.DateInput(attrs={'class': 'form-control', 'type': 'date'}),
+    )
+    email_subject = forms.CharField(
+        max_length=200,
+        label="Sujet",
+        widget=forms.TextInput(attrs={
+            'class': 'form-control',
+            'placeholder': "Sujet de l'email",
+        })
+    )
+    email_body = forms.CharField(
+        label="Message",
+        help_text="Variables : {{ nom }}, {{ email }}, {{ type }}, {{ date }}, {{ heure }}",
+        widget=forms.Textarea(attrs={
+            'class': 'form-control',
+            'rows': 10,
+            'placeholder': 'Bonjour {{ nom }}, ...',
+        })
+    )
+
+    def _clean_template(self, field):
+        value = self.cleaned_data[field]
+        try:
+            Template(value)
+        except TemplateSyntaxError:
+            raise forms.ValidationError("Modèle invalide : vérifiez les variables entre {{ }}.")
+        return value
+
+    def clean_email_subject(self):
+        """Strip line breaks (header injection) and check the template compiles."""
+        self.cleaned_data['email_subject'] = self.cleaned_data['email_subject'].replace('\n', '').replace('\r', '')
+        return self._clean_template('email_subject')
+
+    def clean_email_body(self):
+        """Check the template compiles."""
+        return self._clean_template('email_body')
+
+    def clean(self):
+        cleaned_data = super().clean()
+        date_from, date_to = cleaned_data.get('date_from'), cleaned_data.get('date_to')
+        if date_from and date_to and date_from > date_to:
+            raise forms.ValidationError("La date de début doit précéder la date de fin.")
+        return cleaned_data
+
+    def appointments(self):
+        """Return the appointments matching the validated filters."""
+        queryset = Appointment.objects.all()
+        if self.cleaned_data.get('appointment_type'):
+            queryset = queryset.filter(appointment_type=self.cleaned_data['appointment_type'])
+        if self.cleaned_data.get('status'):
+            queryset = queryset.filter(status=self.cleaned_data['status'])
+        if self.cleaned_data.get('date_from'):
+            queryset = queryset.filter(appointment_date__gte=self.cleaned_data['date_from'])
+        if self.cleaned_data.get('date_to'):
+            queryset = queryset.filter(appointment_date__lte=self.cleaned_data['date_to'])
+        return queryset
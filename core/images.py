@@ -0,0 +1,140 @@
+"""
+Responsive image variants for the static images.
+
+Every JPEG/PNG under core/images is resized to the widths of RESPONSIVE_IMAGE_WIDTHS
+(never upscaled) and encoded as AVIF (when Pillow supports it) and WebP. Variant names
+carry a hash of their content, e.g. core/images/logo-480w.1a2b3c4d5e6f.webp, so they can
+be cached forever. The list of variants is written to VARIANTS_MANIFEST, which the
+`responsive_image` template tag reads to build <picture> srcsets.
+
+Pillow is optional: without it nothing is generated and the tag falls back to a plain
+lazy-loaded <img>.
+"""
+
+from functools import lru_cache
+import hashlib
+from io import BytesIO
+import json
+import logging
+import posixpath
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+SOURCE_PREFIX = 'core/images/'
+SOURCE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+VARIANTS_MANIFEST = 'core/images/responsive.json'
+
+DEFAULT_WIDTHS = [160, 480, 960, 1600]
+
+# Format, Pillow encoder options
+FORMATS = [
+    ('avif', {'quality': 55}),
+    ('webp', {'quality': 78, 'method': 6}),
+]
+
+
+def pillow_available():
+    return Image is not None
+
+
+def supported_formats():
+    """Return the FORMATS entries this Pillow build can encode."""
+    if Image is None:
+        return []
+    # AVIF is in the Pillow 11.3+ wheels (requirements.txt), WebP in every standard build
+    Image.init()
+    return [(name, options) for name, options in FORMATS if name.upper() in Image.SAVE]
+
+
+def is_source_image(path):
+    return path.startswith(SOURCE_PREFIX) and path.lower().endswith(SOURCE_EXTENSIONS)
+
+
+def _variant_name(path, width, extension, content):
+    stem = posixpath.splitext(path)[0]
+    digest = hashlib.md5(content).hexdigest()[:12]
+    return f"{stem}-{width}w.{digest}.{extension}"
+
+
+def _encode(image, extension, options):
+    buffer = BytesIO()
+    image.save(buffer, format=extension.upper(), **options)
+    return buffer.getvalue()
+
+
+def generate_variants(storage, path, widths=None):
+    """
+    Write the variants of one image to `storage` and return its manifest entry.
+
+    The entry is {'width', 'height', 'sources': {format: [[width, name], ...]}}, or None if
+    the file is not a readable image.
+    """
+    widths = widths or getattr(settings, 'RESPONSIVE_IMAGE_WIDTHS', DEFAULT_WIDTHS)
+    formats = supported_formats()
+    try:
+        with storage.open(path) as f:
+            original = Image.open(f)
+            original.load()
+    except (OSError, ValueError) as e:
+        logger.warning("Skipping unreadable image", extra={'path': path, 'error': str(e)})
+        return None
+
+    # Camera photos carry their orientation in EXIF
+    original = ImageOps.exif_transpose(original)
+    if original.mode not in ('RGB', 'RGBA'):
+        original = original.convert('RGBA' if 'transparency' in original.info else 'RGB')
+
+    # Sizes below the original, plus the original width when it is smaller than the largest
+    targets = sorted({min(width, original.width) for width in widths})
+    sources = {name: [] for name, options in formats}
+    for width in targets:
+        height = round(original.height * width / original.width)
+        resized = original if width == original.width else original.resize((width, height), Image.LANCZOS)
+        for extension, options in formats:
+            content = _encode(resized, extension, options)
+            name = _variant_name(path, width, extension, content)
+            if not storage.exists(name):
+                storage.save(name, ContentFile(content))
+            sources[extension].append([width, name])
+
+    return {'width': original.width, 'height': original.height, 'sources': sources}
+
+
+def build_variants(storage, paths, widths=None):
+    """Generate variants for every source image of `paths`, write the manifest and return it."""
+    if Image is None:
+        logger.warning("Pillow is not installed: responsive image variants are not generated.")
+        return {}
+
+    manifest = {}
+    for path in sorted(paths):
+        if is_source_image(path):
+            entry = generate_variants(storage, path, widths)
+            if entry:
+                manifest[path] = entry
+
+    if storage.exists(VARIANTS_MANIFEST):
+        storage.delete(VARIANTS_MANIFEST)
+    storage.save(VARIANTS_MANIFEST, ContentFile(json.dumps(manifest, indent=1).encode()))
+    load_variants.cache_clear()
+    return manifest
+
+
+@lru_cache(maxsize=1)
+def load_variants():
+    """Return the variants manifest written by collectstatic, or {} if there is none."""
+    from django.contrib.staticfiles.storage import staticfiles_storage
+
+    try:
+        with staticfiles_storage.open(VARIANTS_MANIFEST) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
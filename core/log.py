@@ -0,0 +1,204 @@
+"""
+Logging that stays off the request thread.
+
+BackgroundHandler (settings.LOGGING) only puts records on a queue; a QueueListener thread
+formats them and writes them to the console and to a rotating, gzip-compressed JSON file.
+RequestIdMiddleware gives each request an id (the X-Request-ID of the proxy, or a new
+one) and RequestContextFilter adds it to every record logged while the request is
+served, with the milliseconds elapsed since it started.
+
+Log a constant message and pass the variable parts as fields, so the file can be queried:
+    logger.info("Appointment booked", extra={'appointment_id': appointment.pk})
+"""
+
+import atexit
+from contextvars import ContextVar
+from datetime import datetime, timezone
+import gzip
+import json
+import logging
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler, TimedRotatingFileHandler
+import os
+import queue
+import re
+import shutil
+import time
+import uuid
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+# (request id, perf_counter at the start) of the request being served
+_request = ContextVar('log_request', default=None)
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+_VALID_REQUEST_ID = re.compile(r'^[A-Za-z0-9._-]{1,64}$')
+
+# LogRecord attributes; anything else on a record came from extra={...}
+_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime', 'request_id', 'duration_ms'}
+
+
+def current_request_id():
+    """The id of the request being served, or None."""
+    state = _request.get()
+    return state[0] if state else None
+
+
+def _extra_fields(record):
+    return {key: value for key, value in vars(record).items() if key not in _RECORD_ATTRS}
+
+
+class RequestContextFilter(logging.Filter):
+    """Add request_id and duration_ms (None outside requests) to every record."""
+
+    def filter(self, record):
+        state = _request.get()
+        record.request_id = state[0] if state else None
+        record.duration_ms = round((time.perf_counter() - state[1]) * 1000, 1) if state else None
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, request fields and extras."""
+
+    def format(self, record):
+        entry = {
+            'time': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', None),
+            'duration_ms': getattr(record, 'duration_ms', None),
+            **_extra_fields(record),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class ConsoleFormatter(logging.Formatter):
+    """The readable console format, followed by the request id and the extra fields."""
+
+    def __init__(self):
+        super().__init__('{levelname} {asctime} {module} {message}', style='{')
+
+    def formatMessage(self, record):
+        line = super().formatMessage(record)
+        fields = _extra_fields(record)
+        if getattr(record, 'request_id', None):
+            fields = {'request_id': record.request_id, **fields}
+        return line + ''.join(f' {key}={value}' for key, value in fields.items())
+
+
+def _gzip_rotator(source, dest):
+    with open(source, 'rb') as src, gzip.open(dest, 'wb') as dst:
+        shutil.copyfileobj(src, dst)
+    os.remove(source)
+
+
+def rotating_file_handler(filename, max_bytes=10 * 1024 * 1024, backup_count=10, when=None):
+    """
+    A JSON-lines file handler rotating at `max_bytes`, or at `when` (e.g. 'midnight') if
+    given, keeping `backup_count` gzip-compressed old files.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(filename)), exist_ok=True)
+    if when:
+        handler = TimedRotatingFileHandler(filename, when=when, backupCount=backup_count, encoding='utf-8')
+    else:
+        handler = RotatingFileHandler(filename, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    handler.namer = lambda name: name + '.gz'
+    handler.rotator = _gzip_rotator
+    handler.setFormatter(JsonFormatter())
+    return handler
+
+
+class BackgroundHandler(QueueHandler):
+    """
+    Queue records for a listener thread writing them to the console and, if `filename` is
+    set, to a rotating JSON file (see rotating_file_handler). Calls to the logger return
+    as soon as the record is queued.
+    """
+
+    def __init__(self, filename=None, max_bytes=10 * 1024 * 1024, backup_count=10, when=None, console=True):
+        super().__init__(queue.SimpleQueue())
+        targets = []
+        if console:
+            stream = logging.StreamHandler()
+            stream.setFormatter(ConsoleFormatter())
+            targets.append(stream)
+        if filename:
+            targets.append(rotating_file_handler(filename, max_bytes, backup_count, when or None))
+        self.targets = targets
+        self.listener = QueueListener(self.queue, *targets, respect_handler_level=True)
+        self.listener.start()
+        atexit.register(self.close)
+        # A worker forked from a process that configured logging (gunicorn --preload)
+        # inherits the handler but not the listener thread
+        os.register_at_fork(after_in_child=self._restart)
+
+    def _restart(self):
+        self.queue = queue.SimpleQueue()
+        self.listener = QueueListener(self.queue, *self.targets, respect_handler_level=True)
+        self.listener.start()
+
+    def prepare(self, record):
+        # Merge the arguments now, as they may change once the call returns; the
+        # formatting itself is left to the listener thread
+        record = logging.makeLogRecord(vars(record))
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def close(self):
+        if self.listener._thread is not None:
+            self.listener.stop()
+        for target in self.targets:
+            target.close()
+        super().close()
+
+
+class RequestIdMiddleware:
+    """
+    Serve each request under an id: the proxy's X-Request-ID if it looks like one, else a
+    new uuid. Records logged meanwhile carry it, and it is returned in the response.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def _start(self, request):
+        request_id = request.headers.get(REQUEST_ID_HEADER, '')
+        if not _VALID_REQUEST_ID.match(request_id):
+            request_id = uuid.uuid4().hex
+        request.request_id = request_id
+        return _request.set((request_id, time.perf_counter()))
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        token = self._start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            _request.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
+
+    async def __acall__(self, request):
+        token = self._start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _request.reset(token)
+        response[REQUEST_ID_HEADER] = request.request_id
+        return response
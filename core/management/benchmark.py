@@ -0,0 +1,51 @@
+"""Shared setup for the benchmark management commands."""
+
+from contextlib import contextmanager
+from datetime import timedelta
+import os
+import shutil
+import tempfile
+
+from django.db import connection, connections
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from core.slots import get_calendar
+
+
+@contextmanager
+def benchmark_database():
+    """
+    Run the block against a freshly migrated throwaway database, never the real one.
+
+    With SQLite the test database is a file (not :memory:) so every thread shares it.
+    Static files are served unhashed so templates render without a collectstatic manifest,
+    and rate limits are off (every request comes from the same address).
+    """
+    tmpdir = tempfile.mkdtemp(prefix='btp-bench-')
+    setup_test_environment()
+    if connection.vendor == 'sqlite':
+        connection.settings_dict['TEST'] = {**connection.settings_dict.get('TEST', {}), 'NAME': os.path.join(tmpdir, 'bench.sqlite3')}
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        with override_settings(
+            STATICFILES_STORAGE='django.contrib.staticfiles.storage.StaticFilesStorage',
+            RATELIMIT_ENABLED=False,
+        ):
+            yield
+    finally:
+        connections.close_all()
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+
+
+def open_days(start, count):
+    """Return the first `count` days from `start` that the booking calendar opens."""
+    calendar = get_calendar()
+    days = []
+    day = start
+    while len(days) < count:
+        if calendar.is_open_day(day):
+            days.append(day)
+        day += timedelta(days=1)
+    return days
@@ -0,0 +1,150 @@
+"""Compare the availability/booking API under sync WSGI and under ASGI at high concurrency."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time as clock
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test import AsyncClient, Client
+from django.urls import reverse
+
+from core.management.benchmark import benchmark_database, open_days
+
+MODES = ['wsgi', 'asgi']
+
+
+class Command(BaseCommand):
+    help = (
+        "Drive the availability and booking API with many concurrent clients, once through "
+        "the WSGI handler with the sync views on a fixed thread pool (sync gunicorn workers) "
+        "and once through the ASGI handler with the async views on one event loop (uvicorn), "
+        "each in its own process and throwaway database, and compare throughput and latency. "
+        "Set DATABASE_URL/REDIS_URL to measure against the production services."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=200, help="Simultaneous clients.")
+        parser.add_argument('--requests', type=int, default=2000, help="Total requests per mode.")
+        parser.add_argument('--threads', type=int, default=8, help="WSGI worker threads (requests served at once).")
+        parser.add_argument('--write-ratio', type=float, default=0.1, help="Share of requests that are bookings.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--mode', choices=MODES, help="Run a single mode in this process (used internally).")
+
+    def handle(self, *args, **options):
+        if options['mode']:
+            result = self._run_mode(options)
+            self.stdout.write(json.dumps(result))
+            return
+
+        results = {}
+        for mode in MODES:
+            self.stdout.write(f"Running {mode}...")
+            command = [
+                sys.executable, sys.argv[0], 'benchmark_asgi', '--mode', mode,
+                '--concurrency', str(options['concurrency']), '--requests', str(options['requests']),
+                '--threads', str(options['threads']), '--write-ratio', str(options['write_ratio']),
+            ]
+            env = {**os.environ, 'ASYNC_VIEWS': str(mode == 'asgi')}
+            child = subprocess.run(command, env=env, capture_output=True, text=True)
+            if child.returncode:
+                raise CommandError(f"{mode} run failed:\n{child.stderr}")
+            results[mode] = json.loads(child.stdout.strip().splitlines()[-1])
+            self._report(mode, results[mode])
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _report(self, mode, result):
+        self.stdout.write(
+            f"{mode:>5}: {result['requests_per_second']:>8} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+            f"p95 {result['p95_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+            f"({result['failures']} failures, {result['concurrency']} clients)"
+        )
+
+    def _run_mode(self, options):
+        mode = options['mode']
+        if settings.ASYNC_VIEWS != (mode == 'asgi'):
+            raise CommandError(f"Run the {mode} mode with ASYNC_VIEWS={mode == 'asgi'}.")
+        with benchmark_database():
+            days = open_days(date.today() + timedelta(days=1), 60)
+            requests = self._plan(options['requests'], options['write_ratio'], days)
+            latencies, failures, elapsed = asyncio.run(self._drive(mode, requests, options['concurrency'], options['threads']))
+            connections.close_all()
+
+        ms = sorted(latency * 1000 for latency in latencies)
+        percentiles = statistics.quantiles(ms, n=100, method='inclusive')
+        return {
+            'mode': mode,
+            'concurrency': options['concurrency'],
+            'threads': options['threads'] if mode == 'wsgi' else None,
+            'requests': len(ms),
+            'failures': failures,
+            'elapsed_seconds': round(elapsed, 3),
+            'requests_per_second': round(len(ms) / elapsed, 1),
+            'p50_ms': round(percentiles[49], 2),
+            'p95_ms': round(percentiles[94], 2),
+            'p99_ms': round(percentiles[98], 2),
+        }
+
+    def _plan(self, count, write_ratio, days):
+        """Return the (method, path, data, expected statuses) of every request, bookings spread evenly."""
+        every = round(1 / write_ratio) if write_ratio > 0 else 0
+        slots_url = reverse('api_available_slots')
+        booking_url = reverse('api_book_appointment')
+        requests = []
+        bookings = 0
+        for i in range(count):
+            appointment_type = ('formation', 'livrables')[i % 2]
+            if every and i % every == 0:
+                # Seven one-hour slots a day; later days first so reads see the writes
+                day = days[-1 - bookings // 14 % len(days)]
+                requests.append(('post', booking_url, {
+                    'type': appointment_type, 'name': 'Bench', 'email': 'bench@example.com',
+                    'appointment_date': day.isoformat(), 'appointment_time': f'{9 + bookings // 2 % 7:02d}:00',
+                }, (201, 400, 409)))
+                bookings += 1
+            else:
+                start = days[i % 30]
+                requests.append(('get', slots_url, {
+                    'type': appointment_type, 'from': start.isoformat(), 'to': (start + timedelta(days=30)).isoformat(),
+                }, (200,)))
+        return requests
+
+    async def _drive(self, mode, requests, concurrency, threads):
+        """Closed loop: `concurrency` clients each send their next request as soon as the last one returned."""
+        queue = list(reversed(requests))
+        latencies = []
+        failures = 0
+        pool = ThreadPoolExecutor(max_workers=threads) if mode == 'wsgi' else None
+        loop = asyncio.get_running_loop()
+
+        async def client_loop():
+            nonlocal failures
+            client = AsyncClient() if mode == 'asgi' else Client()
+            while queue:
+                method, path, data, expected = queue.pop()
+                started = clock.perf_counter()
+                if mode == 'asgi':
+                    response = await getattr(client, method)(path, data, secure=True)
+                else:
+                    # Waits for a free worker thread, like a request queued on a sync server
+                    response = await loop.run_in_executor(pool, lambda: getattr(client, method)(path, data, secure=True))
+                latencies.append(clock.perf_counter() - started)
+                failures += response.status_code not in expected
+
+        started = clock.perf_counter()
+        await asyncio.gather(*(client_loop() for _ in range(concurrency)))
+        elapsed = clock.perf_counter() - started
+        if pool:
+            pool.shutdown()
+        return latencies, failures, elapsed
@@ -0,0 +1,92 @@
+"""Check that the streaming CSV exports stay under a memory ceiling on a large table."""
+
+from datetime import date, time, timedelta
+import time as clock
+import tracemalloc
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from core.exports import EXPORTS
+from core.management.benchmark import benchmark_database
+from core.models import Appointment, ContactMessage, SentEmail
+from core.views import dashboard_export
+
+SEED_BATCH = 5000
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with synthetic rows, stream every CSV export and fail "
+        "if the peak Python memory of an export exceeds the ceiling."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help="Rows per exported table.")
+        parser.add_argument('--max-memory-mb', type=float, default=20, help="Peak memory allowed per export.")
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        ceiling = options['max_memory_mb']
+        over = []
+        with benchmark_database():
+            self.stdout.write(f"Seeding {rows} rows per table...")
+            staff = self._seed(rows)
+            factory = RequestFactory()
+            for kind in EXPORTS:
+                request = factory.get(f'/tableau-de-bord/export/{kind}.csv')
+                request.user = staff
+                peak_mb, size_mb, lines, elapsed = self._measure(request, kind)
+                self.stdout.write(
+                    f"{kind:>12}: {lines - 1} rows, {size_mb:.1f} MB in {elapsed:.2f}s, "
+                    f"peak memory {peak_mb:.1f} MB"
+                )
+                if peak_mb > ceiling:
+                    over.append(kind)
+
+        if over:
+            raise CommandError(f"Exports over the {ceiling} MB ceiling: {', '.join(over)}")
+        self.stdout.write(self.style.SUCCESS(f"All exports stayed under {ceiling} MB."))
+
+    def _measure(self, request, kind):
+        tracemalloc.start()
+        started = clock.perf_counter()
+        response = dashboard_export(request, kind)
+        size = lines = 0
+        for chunk in response.streaming_content:
+            size += len(chunk)
+            lines += chunk.count(b'\n')
+        elapsed = clock.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        return peak / 2 ** 20, size / 2 ** 20, lines, elapsed
+
+    def _seed(self, count):
+        staff = User.objects.create_user(username='bench-staff', password='bench-pass', is_staff=True)
+        start = date.today() - timedelta(days=count // 14 + 1)
+        for offset in range(0, count, SEED_BATCH):
+            size = min(SEED_BATCH, count - offset)
+            appointments = Appointment.objects.bulk_create([
+                Appointment(
+                    name=f"Client {i}", email=f"client{i}@example.com", phone="+33 6 00 00 00 00",
+                    appointment_type=('formation', 'livrables')[i % 2],
+                    appointment_date=start + timedelta(days=i // 14),
+                    appointment_time=time(9 + (i // 2) % 7, 0),
+                    subject="Projet de rénovation", notes="Accès par la cour, sonner deux fois.",
+                    status='completed',
+                )
+                for i in range(offset, offset + size)
+            ])
+            ContactMessage.objects.bulk_create([
+                ContactMessage(name=f"Client {i}", email=f"client{i}@example.com", subject="Devis", message="Bonjour, " * 20)
+                for i in range(offset, offset + size)
+            ])
+            SentEmail.objects.bulk_create([
+                SentEmail(
+                    appointment=appointment, subject="Suite à votre rendez-vous", body="Merci pour votre visite. " * 10,
+                    recipient_email=appointment.email, sent_by=staff, status='sent', attempts=1,
+                )
+                for appointment in appointments
+            ])
+        return staff
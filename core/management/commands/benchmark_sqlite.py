@@ -0,0 +1,146 @@
+"""Compare booking/dashboard throughput with SQLite's defaults and the tuned profile."""
+
+from datetime import date, time, timedelta
+from concurrent.futures import ThreadPoolExecutor
+import json
+import time as clock
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from core.management.benchmark import benchmark_database, open_days
+from core.models import Appointment
+from core.slots import get_calendar
+
+# Out-of-the-box behaviour, made explicit so a WAL file can be switched back
+DEFAULT_PROFILE = {'journal_mode': 'delete', 'synchronous': 'full'}
+
+
+def _tuned_profile():
+    """settings.SQLITE_PRAGMAS, with WAL (the throwaway benchmark database is never excluded)."""
+    if not settings.SQLITE_PRAGMAS:
+        raise CommandError("SQLITE_TUNING is off: there is no tuned profile to compare.")
+    return {**settings.SQLITE_PRAGMAS, 'journal_mode': 'wal'}
+
+
+def _future_slots(count):
+    """Return `count` distinct future (date, time) formation slots of the booking calendar."""
+    slots = get_calendar().slots('formation')
+    days = open_days(date.today() + timedelta(days=1), count // len(slots) + 1)
+    return [(day, slot_time) for day in days for slot_time in slots][:count]
+
+
+class Command(BaseCommand):
+    help = "Benchmark booking and dashboard throughput with default vs tuned SQLite settings."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8, help="Concurrent clients (half read, half write).")
+        parser.add_argument('--requests', type=int, default=25, help="Requests per client.")
+        parser.add_argument('--seed', type=int, default=200, help="Existing appointments in the database.")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("This benchmark only applies to the SQLite backend.")
+
+        threads = max(options['threads'], 2)
+        per_client = options['requests']
+
+        profiles = (('default', DEFAULT_PROFILE), ('tuned', _tuned_profile()))
+        results = {}
+        with benchmark_database():
+            self._seed(options['seed'])
+            for name, pragmas in profiles:
+                results[name] = self._run_profile(pragmas, threads, per_client)
+                self._report(name, results[name])
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+    def _seed(self, count):
+        User.objects.create_user(username='bench-staff', password='bench-pass', is_staff=True)
+        start = date.today() - timedelta(days=count // 7 + 1)
+        Appointment.objects.bulk_create([
+            Appointment(
+                name=f"Client {i}", email=f"client{i}@example.com",
+                appointment_type=('formation', 'livrables')[i % 2],
+                appointment_date=start + timedelta(days=i // 14),
+                appointment_time=time(9 + (i // 2) % 7, 0),
+                status='completed',
+            )
+            for i in range(count)
+        ])
+
+    def _run_profile(self, pragmas, threads, per_client):
+        connections.close_all()
+        cache.clear()
+        with override_settings(SQLITE_PRAGMAS=pragmas):
+            writers = threads // 2
+            slots = _future_slots(writers * per_client)
+            last_seed = Appointment.objects.order_by('-pk').values_list('pk', flat=True).first() or 0
+            staff_client = Client()
+            staff_client.force_login(User.objects.get(username='bench-staff'))
+
+            # Each client returns (kind, successes, seconds spent in its requests, finish time)
+            def write(index):
+                client = Client(raise_request_exception=False)
+                ok, busy = 0, 0.0
+                for day, slot_time in slots[index * per_client:(index + 1) * per_client]:
+                    request_started = clock.perf_counter()
+                    response = client.post(reverse('formation'), {
+                        'name': 'Bench', 'email': 'bench@example.com',
+                        'appointment_date': day.isoformat(), 'appointment_time': slot_time.strftime('%H:%M'),
+                    }, secure=True)
+                    busy += clock.perf_counter() - request_started
+                    ok += response.status_code == 302
+                connections.close_all()
+                return 'write', ok, busy, clock.perf_counter()
+
+            def read(index):
+                client = Client(raise_request_exception=False)
+                client.cookies = staff_client.cookies
+                ok, busy = 0, 0.0
+                for _ in range(per_client):
+                    request_started = clock.perf_counter()
+                    response = client.get(reverse('dashboard_home'), secure=True)
+                    busy += clock.perf_counter() - request_started
+                    ok += response.status_code == 200
+                connections.close_all()
+                return 'read', ok, busy, clock.perf_counter()
+
+            started = clock.perf_counter()
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                futures = [executor.submit(write, i) for i in range(writers)]
+                futures += [executor.submit(read, i) for i in range(threads - writers)]
+                outcomes = [future.result() for future in futures]
+            elapsed = clock.perf_counter() - started
+
+            Appointment.objects.filter(pk__gt=last_seed).delete()
+
+        attempted = {'write': writers * per_client, 'read': (threads - writers) * per_client}
+        result = {'pragmas': pragmas, 'elapsed_seconds': round(elapsed, 3)}
+        for kind, label in (('write', 'writes'), ('read', 'reads')):
+            mine = [outcome for outcome in outcomes if outcome[0] == kind]
+            ok = sum(outcome[1] for outcome in mine)
+            # Each rate over the time its own clients ran (readers and writers finish apart)
+            window = max(outcome[3] for outcome in mine) - started
+            result[f'{label}_ok'] = ok
+            result[f'{label}_failed'] = attempted[kind] - ok
+            result[f'{label}_per_second'] = round(ok / window, 1)
+            result[f'{kind}_mean_ms'] = round(sum(outcome[2] for outcome in mine) / attempted[kind] * 1000, 2)
+        return result
+
+    def _report(self, name, result):
+        self.stdout.write(
+            f"{name:>8}: {result['reads_per_second']:>7} reads/s ({result['read_mean_ms']} ms), "
+            f"{result['writes_per_second']:>7} bookings/s ({result['write_mean_ms']} ms) "
+            f"({result['reads_failed']} read / {result['writes_failed']} write failures, {result['elapsed_seconds']}s)"
+        )
@@ -0,0 +1,224 @@
+"""Latency and queries-per-request benchmark of the booking, availability and dashboard views."""
+
+from datetime import date, datetime, time, timedelta
+import json
+import platform
+import statistics
+import time as clock
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.urls import reverse
+
+from core.management.benchmark import benchmark_database, open_days
+from core.models import Appointment, ContactMessage
+
+SEED_BATCH = 5000
+PASSWORD = 'bench-pass'
+
+SCENARIOS = ['available_slots', 'available_slots_range', 'formation_post', 'dashboard_home', 'mes_rendez_vous', 'connexion_view']
+
+
+def _summary(latencies, queries, failures):
+    """Percentiles (ms) and query counts of one scenario."""
+    ms = sorted(latency * 1000 for latency in latencies)
+    percentiles = statistics.quantiles(ms, n=100, method='inclusive') if len(ms) > 1 else ms * 99
+    return {
+        'requests': len(ms),
+        'failures': failures,
+        'mean_ms': round(statistics.fmean(ms), 2),
+        'p50_ms': round(percentiles[49], 2),
+        'p90_ms': round(percentiles[89], 2),
+        'p95_ms': round(percentiles[94], 2),
+        'p99_ms': round(percentiles[98], 2),
+        'max_ms': round(ms[-1], 2),
+        'queries_mean': round(statistics.fmean(queries), 2),
+        'queries_max': max(queries),
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway database with synthetic appointments, users and messages, then "
+        "measure latency percentiles and queries per request of the main views. Save the "
+        "results with --output and compare a later run with --baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--appointments', type=int, default=5000, help="Seeded appointments.")
+        parser.add_argument('--users', type=int, default=200, help="Seeded client accounts.")
+        parser.add_argument('--messages', type=int, default=1000, help="Seeded contact messages.")
+        parser.add_argument('--requests', type=int, default=200, help="Measured requests per scenario.")
+        parser.add_argument('--warmup', type=int, default=10, help="Unmeasured requests per scenario.")
+        parser.add_argument('--scenario', action='append', choices=SCENARIOS, help="Only run this scenario (repeatable).")
+        parser.add_argument('--output', help="Write the results as JSON to this file.")
+        parser.add_argument('--baseline', help="JSON results of a previous run to compare against.")
+        parser.add_argument('--max-regression', type=float, help="Fail if a p95 grew by more than this percentage.")
+
+    def handle(self, *args, **options):
+        baseline = None
+        if options['baseline']:
+            try:
+                with open(options['baseline']) as f:
+                    baseline = json.load(f)['scenarios']
+            except (OSError, ValueError, KeyError) as e:
+                raise CommandError(f"Cannot read baseline {options['baseline']}: {str(e)}")
+
+        results = {
+            'meta': {
+                'created_at': datetime.now().isoformat(timespec='seconds'),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'cache': settings.CACHES['default']['BACKEND'],
+                'appointments': options['appointments'],
+                'users': options['users'],
+                'messages': options['messages'],
+                'requests': options['requests'],
+            },
+            'scenarios': {},
+        }
+        with benchmark_database():
+            self.stdout.write("Seeding...")
+            self._seed(options['appointments'], options['users'], options['messages'])
+            cache.clear()
+            scenarios = self._scenarios(options['requests'] + options['warmup'])
+            # Keep every query of a request in connection.queries_log (reset per request)
+            connection.force_debug_cursor = True
+            try:
+                for name in options['scenario'] or SCENARIOS:
+                    results['scenarios'][name] = self._run(scenarios[name], options['requests'], options['warmup'])
+                    self._report(name, results['scenarios'][name], (baseline or {}).get(name))
+            finally:
+                connection.force_debug_cursor = False
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(results, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        failed = [name for name, result in results['scenarios'].items() if result['failures']]
+        if failed:
+            raise CommandError(f"Unexpected responses in: {', '.join(failed)}")
+        if baseline and options['max_regression'] is not None:
+            regressed = [
+                name for name, result in results['scenarios'].items()
+                if name in baseline and result['p95_ms'] > baseline[name]['p95_ms'] * (1 + options['max_regression'] / 100)
+            ]
+            if regressed:
+                raise CommandError(f"p95 regressed by more than {options['max_regression']}%: {', '.join(regressed)}")
+
+    def _seed(self, appointments, users, messages):
+        password = make_password(PASSWORD)
+        User.objects.create_user(username='bench-staff', password=PASSWORD, is_staff=True)
+        clients = User.objects.bulk_create([
+            User(username=f'client{i}', email=f'client{i}@example.com', password=password)
+            for i in range(max(users, 1))
+        ])
+
+        # Two thirds in the past (completed), the rest from tomorrow on, 14 slots a day
+        past = appointments * 2 // 3
+        past_days = open_days(date.today() - timedelta(days=past // 14 * 7 // 5 + 7), past // 14 + 1)
+        future_days = open_days(date.today() + timedelta(days=1), (appointments - past) // 14 + 1)
+        # Benchmark bookings go after the seeded ones so every one of them succeeds
+        self.booking_start = future_days[-1] + timedelta(days=1)
+        statuses = ['pending', 'confirmed', 'cancelled']
+        for offset in range(0, appointments, SEED_BATCH):
+            batch = []
+            for i in range(offset, min(offset + SEED_BATCH, appointments)):
+                if i < past:
+                    day, status = past_days[i // 14], 'completed'
+                else:
+                    j = i - past
+                    day, status = future_days[j // 14], statuses[j % 3]
+                batch.append(Appointment(
+                    name=f"Client {i}", email=f"client{i}@example.com",
+                    appointment_type=('formation', 'livrables')[i % 2],
+                    appointment_date=day, appointment_time=time(9 + i // 2 % 7, 0),
+                    status=status, user=clients[i % len(clients)],
+                ))
+            Appointment.objects.bulk_create(batch)
+
+        ContactMessage.objects.bulk_create([
+            ContactMessage(name=f"Client {i}", email=f"client{i}@example.com", subject="Devis", message="Bonjour, " * 20)
+            for i in range(messages)
+        ], batch_size=SEED_BATCH)
+
+    def _scenarios(self, count):
+        """Return {name: (client, make_request, expected_status)}; make_request(client, i) sends request i."""
+        staff = Client()
+        staff.force_login(User.objects.get(username='bench-staff'))
+        member = Client()
+        member.force_login(User.objects.get(username='client0'))
+        days = open_days(date.today() + timedelta(days=1), 30)
+        # The seeded client accounts (at most 50 rotated through by the login scenario)
+        usernames = list(User.objects.filter(username__startswith='client').order_by('pk').values_list('username', flat=True)[:50])
+        booking_days = open_days(self.booking_start, count // 7 + 1)
+
+        def available_slots(client, i):
+            return client.get(reverse('api_available_slots'), {'type': 'formation', 'date': days[i % len(days)].isoformat()}, secure=True)
+
+        def available_slots_range(client, i):
+            start = days[i % len(days)]
+            return client.get(reverse('api_available_slots'), {
+                'type': ('formation', 'livrables')[i % 2], 'from': start.isoformat(), 'to': (start + timedelta(days=30)).isoformat(),
+            }, secure=True)
+
+        def formation_post(client, i):
+            return client.post(reverse('formation'), {
+                'name': 'Bench', 'email': 'bench@example.com',
+                'appointment_date': booking_days[i // 7].isoformat(), 'appointment_time': f'{9 + i % 7:02d}:00',
+            }, secure=True)
+
+        def dashboard_home(client, i):
+            params = [{}, {'type': 'formation'}, {'status': 'pending'}, {'type': 'livrables', 'status': 'confirmed'}][i % 4]
+            return client.get(reverse('dashboard_home'), params, secure=True)
+
+        def mes_rendez_vous(client, i):
+            return client.get(reverse('mes_rendez_vous'), secure=True)
+
+        def connexion_view(client, i):
+            # A fresh client each time: a logged-in visitor is redirected before the login runs
+            return Client().post(reverse('connexion'), {'username': usernames[i % len(usernames)], 'password': PASSWORD}, secure=True)
+
+        return {
+            'available_slots': (Client(), available_slots, 200),
+            'available_slots_range': (Client(), available_slots_range, 200),
+            'formation_post': (Client(), formation_post, 302),
+            'dashboard_home': (staff, dashboard_home, 200),
+            'mes_rendez_vous': (member, mes_rendez_vous, 200),
+            'connexion_view': (None, connexion_view, 302),
+        }
+
+    def _run(self, scenario, requests, warmup):
+        client, make_request, expected = scenario
+        latencies, queries = [], []
+        failures = 0
+        for i in range(warmup + requests):
+            started = clock.perf_counter()
+            response = make_request(client, i)
+            elapsed = clock.perf_counter() - started
+            if i < warmup:
+                continue
+            latencies.append(elapsed)
+            queries.append(len(connection.queries_log))
+            failures += response.status_code != expected
+        return _summary(latencies, queries, failures)
+
+    def _report(self, name, result, previous):
+        line = (
+            f"{name:>22}: p50 {result['p50_ms']:>7.2f} ms  p95 {result['p95_ms']:>7.2f} ms  "
+            f"p99 {result['p99_ms']:>7.2f} ms  {result['queries_mean']:>5.1f} queries"
+        )
+        if previous:
+            change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100 if previous['p95_ms'] else 0
+            line += f"  (p95 {change:+.1f}%, queries {result['queries_mean'] - previous['queries_mean']:+.1f})"
+        if result['failures']:
+            line += f"  {result['failures']} unexpected responses"
+        self.stdout.write(line)
@@ -0,0 +1,35 @@
+"""Render the page thumbnails and page index of the project documents."""
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.documents import build_preview, get_document, get_documents, pymupdf_available
+from core.pagecache import invalidate_page_cache
+
+
+class Command(BaseCommand):
+    help = (
+        "Render page thumbnails of the PROJECT_DOCUMENTS PDFs into DOCUMENT_PREVIEW_ROOT "
+        "so the livrables page can show previews. Run it on deploy and whenever a document "
+        "is replaced."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('slugs', nargs='*', help="Documents to render (default: all).")
+
+    def handle(self, *args, **options):
+        if not pymupdf_available():
+            raise CommandError("PyMuPDF is not installed (pip install PyMuPDF).")
+        slugs = options['slugs'] or list(get_documents())
+        for slug in slugs:
+            if get_document(slug) is None:
+                self.stderr.write(f"{slug}: unknown document or missing file, skipped.")
+                continue
+            index = build_preview(slug)
+            if index is None:
+                self.stderr.write(f"{slug}: not a readable PDF, skipped.")
+                continue
+            thumbnails = sum('thumbnail' in page for page in index['pages'])
+            self.stdout.write(f"{slug}: {index['page_count']} pages, {thumbnails} thumbnails.")
+        # The livrables page is page-cached with the previous previews
+        invalidate_page_cache()
+        self.stdout.write(self.style.SUCCESS("Document previews built."))
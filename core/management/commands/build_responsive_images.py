@@ -0,0 +1,41 @@
+"""(Re)generate responsive image variants in STATIC_ROOT."""
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+
+from core.images import SOURCE_PREFIX, build_variants, pillow_available, supported_formats
+
+
+def _walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield f"{directory}{name}"
+    for name in directories:
+        yield from _walk(storage, f"{directory}{name}/")
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate AVIF/WebP variants of the images under core/images in STATIC_ROOT and "
+        "write their manifest. collectstatic already does this; use it to rebuild with "
+        "other widths without recollecting."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--widths', type=int, nargs='+', help="Variant widths in pixels (default: RESPONSIVE_IMAGE_WIDTHS).")
+
+    def handle(self, *args, **options):
+        if not pillow_available():
+            raise CommandError("Pillow is not installed (pip install Pillow).")
+        # The manifest storage knows every collected original; otherwise walk STATIC_ROOT
+        paths = list(getattr(staticfiles_storage, 'hashed_files', {}))
+        if not paths:
+            try:
+                paths = list(_walk(staticfiles_storage, SOURCE_PREFIX))
+            except FileNotFoundError:
+                raise CommandError("No collected static files: run collectstatic first.")
+        manifest = build_variants(staticfiles_storage, paths, options['widths'])
+
+        formats = ', '.join(name for name, _ in supported_formats())
+        variants = sum(len(names) for entry in manifest.values() for names in entry['sources'].values())
+        self.stdout.write(self.style.SUCCESS(f"{len(manifest)} images, {variants} variants ({formats})."))
@@ -0,0 +1,122 @@
+"""Copy every row of an existing SQLite database into the configured (e.g. PostgreSQL) database."""
+
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth.models import Permission
+from django.contrib.contenttypes.models import ContentType
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, transaction, DEFAULT_DB_ALIAS
+from django.db.migrations.recorder import MigrationRecorder
+
+SOURCE_ALIAS = 'sqlite_source'
+
+
+def _ordered_models():
+    """Return all concrete models (including M2M through tables) with FK targets first."""
+    models = [model for model in apps.get_models(include_auto_created=True) if not model._meta.proxy]
+    remaining = {model: {
+        field.related_model._meta.concrete_model
+        for field in model._meta.concrete_fields
+        if field.is_relation and field.related_model is not None and field.related_model is not model
+    } for model in models}
+
+    ordered = []
+    while remaining:
+        ready = [model for model, deps in remaining.items() if not deps & remaining.keys()]
+        if not ready:
+            raise CommandError("Circular foreign keys between models: cannot order the copy.")
+        for model in sorted(ready, key=lambda m: m._meta.label):
+            ordered.append(model)
+            del remaining[model]
+    return ordered
+
+
+@contextmanager
+def _preserve_timestamps(model):
+    """Stop auto_now/auto_now_add fields from overwriting the copied values."""
+    fields = [field for field in model._meta.concrete_fields if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False)]
+    saved = [(field, field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, auto_now, auto_now_add in saved:
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy all data from a SQLite database file into the default database in bulk. "
+        "Run `migrate` on the target first; the source must be migrated to the same state."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', default=str(settings.BASE_DIR / 'db.sqlite3'), help="SQLite file to copy from.")
+        parser.add_argument('--batch-size', type=int, default=2000, help="Rows per INSERT batch.")
+
+    def handle(self, *args, **options):
+        source_path = Path(options['source'])
+        if not source_path.exists():
+            raise CommandError(f"Source database not found: {source_path}")
+
+        connections.settings[SOURCE_ALIAS] = connections.configure_settings({
+            DEFAULT_DB_ALIAS: connections.settings[DEFAULT_DB_ALIAS],
+            SOURCE_ALIAS: {'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(source_path)},
+        })[SOURCE_ALIAS]
+        source, target = connections[SOURCE_ALIAS], connections[DEFAULT_DB_ALIAS]
+
+        if source.settings_dict['NAME'] == target.settings_dict['NAME']:
+            raise CommandError("Source and target are the same database.")
+
+        source_migrations = set(MigrationRecorder(source).applied_migrations())
+        target_migrations = set(MigrationRecorder(target).applied_migrations())
+        if source_migrations != target_migrations:
+            raise CommandError(
+                "Source and target are not migrated to the same state. Run "
+                "`DATABASE_URL=sqlite:///<source> manage.py migrate` and `manage.py migrate` first."
+            )
+
+        models = _ordered_models()
+        # Content types and permissions are created by migrate and replaced below
+        data_models = [model for model in models if model not in (ContentType, Permission)]
+        if any(model._base_manager.using(DEFAULT_DB_ALIAS).exists() for model in data_models):
+            raise CommandError("The target database already contains data; copy into a freshly migrated database.")
+
+        source_tables = set(source.introspection.table_names())
+        with transaction.atomic(using=DEFAULT_DB_ALIAS):
+            # migrate created its own content types and permissions; replace them with the
+            # source rows so every copied foreign key keeps pointing at the same ids
+            ContentType.objects.using(DEFAULT_DB_ALIAS).all().delete()
+
+            for model in models:
+                if model._meta.db_table not in source_tables:
+                    continue
+                copied = self._copy_model(model, options['batch_size'])
+                self.stdout.write(f"{model._meta.label}: {copied} rows")
+
+            with target.cursor() as cursor:
+                for sql in target.ops.sequence_reset_sql(no_style(), models):
+                    cursor.execute(sql)
+
+        self.stdout.write(self.style.SUCCESS("Copy complete."))
+
+    def _copy_model(self, model, batch_size):
+        manager = model._base_manager
+        copied = 0
+        batch = []
+        with _preserve_timestamps(model):
+            for obj in manager.using(SOURCE_ALIAS).order_by('pk').iterator(chunk_size=batch_size):
+                batch.append(obj)
+                if len(batch) >= batch_size:
+                    manager.using(DEFAULT_DB_ALIAS).bulk_create(batch)
+                    copied += len(batch)
+                    batch = []
+            if batch:
+                manager.using(DEFAULT_DB_ALIAS).bulk_create(batch)
+                copied += len(batch)
+        return copied
@@ -0,0 +1,36 @@
+"""Deliver queued dashboard emails (the outbox worker)."""
+
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.outbox import BATCH_SIZE, send_queued
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued follow-up emails in batches over one SMTP connection per batch. "
+        "Runs until the queue has nothing due, or forever with --loop."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help="Emails per SMTP connection.")
+        parser.add_argument('--loop', action='store_true', help="Keep polling the queue instead of exiting when it is empty.")
+        parser.add_argument('--interval', type=float, default=10, help="Seconds to wait between polls with --loop.")
+
+    def handle(self, *args, **options):
+        totals = [0, 0, 0]
+        try:
+            while True:
+                counts = send_queued(options['batch_size'])
+                totals = [total + count for total, count in zip(totals, counts)]
+                if any(counts):
+                    continue
+                if not options['loop']:
+                    break
+                time.sleep(options['interval'])
+        except KeyboardInterrupt:
+            pass
+
+        sent, retried, failed = totals
+        self.stdout.write(f"{sent} sent, {retried} to retry, {failed} failed")
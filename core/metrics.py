@@ -0,0 +1,258 @@
+"""
+Request metrics in the Prometheus text format.
+
+MetricsMiddleware records, per URL name (api_available_slots, dashboard_home, ...):
+request counts by method and status, a latency histogram, the database queries and their
+time, and cache hits/misses. Queries are counted by an execute wrapper installed on every
+database connection (core/signals.py) and cache lookups by the instrumented cache backends
+(core/cache_backends.py); both report to the request being served through a context
+variable, which also follows async views into their sync_to_async threads.
+
+Each process keeps its own registry and writes it to METRICS_DIR/worker-<pid>.json at most
+every METRICS_FLUSH_SECONDS. The /metrics view adds up the snapshots of all workers, so
+the counters cover the whole gunicorn server whichever worker answers the scrape.
+Snapshots not updated for METRICS_STALE_SECONDS (workers that exited) are deleted.
+"""
+
+from contextvars import ContextVar
+import glob
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Latency histogram upper bounds, in seconds
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+FLUSH_SECONDS = getattr(settings, 'METRICS_FLUSH_SECONDS', 10)
+STALE_SECONDS = getattr(settings, 'METRICS_STALE_SECONDS', 24 * 3600)
+
+# Methods kept as label values; any other verb is counted as "other"
+METHODS = {'GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS', 'TRACE', 'CONNECT'}
+
+# Stats of the request being served, None outside requests
+_current = ContextVar('metrics_request', default=None)
+
+
+class RequestStats:
+    __slots__ = ('queries', 'query_seconds', 'cache_hits', 'cache_misses')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+class Registry:
+    """Counters of one process. Keys are label tuples, values plain numbers."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.last_flush = 0.0
+        self.clear()
+
+    def clear(self):
+        self.requests = {}      # (view, method, status): count
+        self.durations = {}     # view: [bucket counts..., +Inf count, sum]
+        self.queries = {}       # view: [count, seconds]
+        self.cache = {}         # (view, result): count
+
+    def record(self, view, method, status, seconds, stats):
+        with self.lock:
+            key = (view, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.durations.setdefault(view, [0] * (len(BUCKETS) + 2))
+            for i, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram[i] += 1
+            histogram[-2] += 1
+            histogram[-1] += seconds
+            queries = self.queries.setdefault(view, [0, 0.0])
+            queries[0] += stats.queries
+            queries[1] += stats.query_seconds
+            for result, count in (('hit', stats.cache_hits), ('miss', stats.cache_misses)):
+                if count:
+                    self.cache[(view, result)] = self.cache.get((view, result), 0) + count
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'requests': [[*key, value] for key, value in self.requests.items()],
+                'durations': [[view, *values] for view, values in self.durations.items()],
+                'queries': [[view, *values] for view, values in self.queries.items()],
+                'cache': [[*key, value] for key, value in self.cache.items()],
+            }
+
+
+registry = Registry()
+
+
+def metrics_dir():
+    return str(getattr(settings, 'METRICS_DIR', None) or os.path.join(tempfile.gettempdir(), 'btp-metrics'))
+
+
+def flush(force=False):
+    """Write this process's snapshot (atomically) if the last one is older than FLUSH_SECONDS."""
+    now = time.monotonic()
+    if not force and now - registry.last_flush < FLUSH_SECONDS:
+        return
+    registry.last_flush = now
+    directory = metrics_dir()
+    path = os.path.join(directory, f'worker-{os.getpid()}.json')
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with tempfile.NamedTemporaryFile('w', dir=directory, suffix='.tmp', delete=False) as f:
+            json.dump(registry.snapshot(), f)
+        os.replace(f.name, path)
+    except OSError as e:
+        logger.warning("Cannot write metrics snapshot", extra={'path': path, 'error': str(e)})
+
+
+def collect():
+    """Add up the snapshots of every live worker (this one included, up to date)."""
+    flush(force=True)
+    total = Registry()
+    for path in glob.glob(os.path.join(metrics_dir(), 'worker-*.json')):
+        try:
+            if time.time() - os.path.getmtime(path) > STALE_SECONDS:
+                os.remove(path)
+                continue
+            with open(path) as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for *key, value in snapshot['requests']:
+            total.requests[tuple(key)] = total.requests.get(tuple(key), 0) + value
+        for view, *values in snapshot['durations']:
+            histogram = total.durations.setdefault(view, [0] * len(values))
+            total.durations[view] = [a + b for a, b in zip(histogram, values)]
+        for view, *values in snapshot['queries']:
+            queries = total.queries.setdefault(view, [0, 0.0])
+            total.queries[view] = [a + b for a, b in zip(queries, values)]
+        for *key, value in snapshot['cache']:
+            total.cache[tuple(key)] = total.cache.get(tuple(key), 0) + value
+    return total
+
+
+def _labels(**labels):
+    def escape(value):
+        return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+    return '{' + ','.join(f'{name}="{escape(value)}"' for name, value in labels.items()) + '}'
+
+
+def render(total):
+    """Prometheus text exposition of an aggregated Registry."""
+    lines = [
+        '# HELP btp_http_requests_total HTTP requests by view, method and status.',
+        '# TYPE btp_http_requests_total counter',
+    ]
+    for (view, method, status), value in sorted(total.requests.items()):
+        lines.append(f'btp_http_requests_total{_labels(view=view, method=method, status=status)} {value}')
+
+    lines += [
+        '# HELP btp_http_request_duration_seconds HTTP request latency by view.',
+        '# TYPE btp_http_request_duration_seconds histogram',
+    ]
+    for view, histogram in sorted(total.durations.items()):
+        for bound, count in zip(BUCKETS, histogram):
+            lines.append(f'btp_http_request_duration_seconds_bucket{_labels(view=view, le=bound)} {count}')
+        lines.append(f'btp_http_request_duration_seconds_bucket{_labels(view=view, le="+Inf")} {histogram[-2]}')
+        lines.append(f'btp_http_request_duration_seconds_sum{_labels(view=view)} {histogram[-1]:.6f}')
+        lines.append(f'btp_http_request_duration_seconds_count{_labels(view=view)} {histogram[-2]}')
+
+    lines += [
+        '# HELP btp_db_queries_total Database queries by view.',
+        '# TYPE btp_db_queries_total counter',
+    ]
+    lines += [f'btp_db_queries_total{_labels(view=view)} {count}' for view, (count, _) in sorted(total.queries.items())]
+    lines += [
+        '# HELP btp_db_query_seconds_total Time spent in database queries by view.',
+        '# TYPE btp_db_query_seconds_total counter',
+    ]
+    lines += [f'btp_db_query_seconds_total{_labels(view=view)} {seconds:.6f}' for view, (_, seconds) in sorted(total.queries.items())]
+
+    lines += [
+        '# HELP btp_cache_requests_total Cache lookups by view and result (hit or miss).',
+        '# TYPE btp_cache_requests_total counter',
+    ]
+    for (view, result), value in sorted(total.cache.items()):
+        lines.append(f'btp_cache_requests_total{_labels(view=view, result=result)} {value}')
+    return '\n'.join(lines) + '\n'
+
+
+def record_query(execute, sql, params, many, context):
+    """Database execute wrapper counting the queries of the current request."""
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.query_seconds += time.perf_counter() - started
+
+
+def record_cache(hits, misses):
+    """Count cache lookups of the current request (called by the instrumented backends)."""
+    stats = _current.get()
+    if stats is not None:
+        stats.cache_hits += hits
+        stats.cache_misses += misses
+
+
+def _view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return '<unresolved>'
+    return match.view_name
+
+
+class MetricsMiddleware:
+    """Record every request in the process registry (see the module docstring)."""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, time.perf_counter() - started, stats)
+        return response
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        token = _current.set(stats)
+        started = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self._record(request, response, time.perf_counter() - started, stats)
+        return response
+
+    def _record(self, request, response, seconds, stats):
+        method = request.method if request.method in METHODS else 'other'
+        registry.record(_view_name(request), method, response.status_code, seconds, stats)
+        flush()
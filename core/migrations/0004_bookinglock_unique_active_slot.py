@@ -0,0 +1,38 @@
+# Generated by Django 4.2.28 on 2026-10-17 05:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_sentemail'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookingLock',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('appointment_type', models.CharField(choices=[('formation', 'Formation'), ('livrables', 'Livrables')], max_length=20)),
+                ('appointment_date', models.DateField()),
+                ('version', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Verrou de réservation',
+                'verbose_name_plural': 'Verrous de réservation',
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='appointment',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='appointment',
+            constraint=models.UniqueConstraint(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=('appointment_type', 'appointment_date', 'appointment_time'), name='unique_active_appointment_slot'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='bookinglock',
+            unique_together={('appointment_type', 'appointment_date')},
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2.28 on 2026-10-17 05:59
+
+from django.db import migrations, models
+from django.db.models import F
+import django.utils.timezone
+
+
+def mark_existing_sent(apps, schema_editor):
+    """Emails recorded before the outbox were sent synchronously."""
+    SentEmail = apps.get_model('core', 'SentEmail')
+    SentEmail.objects.update(status='sent', attempts=1, created_at=F('sent_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_appointment_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='sentemail',
+            options={'ordering': ['-created_at'], 'verbose_name': 'Email envoyé', 'verbose_name_plural': 'Emails envoyés'},
+        ),
+        migrations.AddField(
+            model_name='sentemail',
+            name='attempts',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='sentemail',
+            name='created_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='sentemail',
+            name='last_error',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='sentemail',
+            name='next_attempt_at',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+        migrations.AddField(
+            model_name='sentemail',
+            name='status',
+            field=models.CharField(choices=[('queued', 'En attente'), ('sent', 'Envoyé'), ('failed', 'Échec')], default='queued', max_length=10),
+        ),
+        migrations.RunPython(mark_existing_sent, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='sentemail',
+            name='sent_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='sentemail',
+            index=models.Index(fields=['status', 'next_attempt_at'], name='sentemail_status_due_idx'),
+        ),
+    ]
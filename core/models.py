@@ -1,9 +1,10 @@
 """Models for the core application."""
 
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import User
 from django.core.exceptions import ValidationError
-from datetime import time, datetime
+from .slots import get_calendar, IntervalIndex, minutes_to_time
 
 
 class ContactMessage(models.Model):
@@ -39,6 +40,9 @@ class Appointment(models.Model):
         ('completed', 'Terminé'),
     ]
 
+    # Statuses that keep a slot occupied
+    BLOCKING_STATUSES = ['pending', 'confirmed']
+
     # User information (can be null if user not registered)
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True, related_name='appointments')
     name = models.CharField(max_length=100, help_text="Nom complet")
@@ -64,41 +68,132 @@ class Appointment(models.Model):
         ordering = ['appointment_date', 'appointment_time']
         verbose_name = 'Rendez-vous'
         verbose_name_plural = 'Rendez-vous'
-        unique_together = ['appointment_type', 'appointment_date', 'appointment_time']
+        constraints = [
+            # Only active bookings hold a slot, so a cancelled one can be booked again
+            models.UniqueConstraint(
+                fields=['appointment_type', 'appointment_date', 'appointment_time'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='unique_active_appointment_slot',
+            ),
+        ]
+        indexes = [
+            # Availability and conflict checks: type + date (range), covering time/status/duration
+            models.Index(
+                fields=['appointment_type', 'appointment_date', 'appointment_time', 'status', 'duration_hours'],
+                name='appt_type_date_time_idx',
+            ),
+            # mes_rendez_vous: a user's appointments by date/time
+            models.Index(fields=['user', 'appointment_date', 'appointment_time'], name='appt_user_date_time_idx'),
+            # Dashboard list (unfiltered and status-filtered) and per-day/week breakdowns
+            models.Index(fields=['appointment_date', 'appointment_time'], name='appt_date_time_idx'),
+            models.Index(fields=['status', 'appointment_date', 'appointment_time'], name='appt_status_date_time_idx'),
+            # Dashboard counters: index-only scan
+            models.Index(fields=['status', 'appointment_type'], name='appt_status_type_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_appointment_type_display()} - {self.name} - {self.appointment_date} à {self.appointment_time}"
 
+    # (appointment_type, appointment_date) as loaded from the database, used to invalidate
+    # the previous slot's cached availability when an appointment is moved
+    loaded_slot = None
+
+    # Whether clean() checks overlaps. The booking forms turn it off: reserve_appointment()
+    # checks under the day lock and reports a conflict as SlotTaken with alternatives.
+    check_conflict = True
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.loaded_slot = (
+            instance.__dict__.get('appointment_type'),
+            instance.__dict__.get('appointment_date'),
+        )
+        return instance
+
     def clean(self):
-        """Validate appointment time is within business hours (9:00-16:00)."""
+        """Validate the appointment fits the opening-hours calendar and overlaps no booking."""
+        calendar = get_calendar()
         if self.appointment_time:
-            if self.appointment_time < time(9, 0) or self.appointment_time >= time(16, 0):
-                raise ValidationError("Les rendez-vous sont disponibles de 9h à 16h du lundi au vendredi.")
+            calendar.validate_time(self.appointment_type, self.appointment_time, self.duration_minutes)
 
-        # Check if appointment is on weekend
         if self.appointment_date:
-            if self.appointment_date.weekday() >= 5:  # 5 = Saturday, 6 = Sunday
-                raise ValidationError("Les rendez-vous ne sont disponibles que du lundi au vendredi.")
+            calendar.validate_date(self.appointment_date)
+
+        if self.check_conflict and self.appointment_time and self.appointment_date and self.status in self.BLOCKING_STATUSES:
+            if self.has_conflict():
+                raise ValidationError({'appointment_time': "Ce créneau est déjà réservé. Veuillez choisir un autre horaire."})
+
+    @property
+    def duration_minutes(self):
+        return (self.duration_hours or 1) * 60
+
+    def has_conflict(self):
+        """
+        Return True if another blocking appointment overlaps this one's time interval.
+
+        Only rows of the same (type, date) starting before this appointment ends are read,
+        a range scan on the (appointment_type, appointment_date, appointment_time) index.
+        """
+        start = self.appointment_time.hour * 60 + self.appointment_time.minute
+        others = Appointment.objects.filter(
+            appointment_type=self.appointment_type,
+            appointment_date=self.appointment_date,
+            appointment_time__lt=minutes_to_time(start + self.duration_minutes),
+            status__in=self.BLOCKING_STATUSES,
+        ).exclude(pk=self.pk).values_list('appointment_time', 'duration_hours')
+        return IntervalIndex.from_bookings(others).overlaps(self.appointment_time, self.duration_minutes)
 
     def save(self, *args, **kwargs):
         self.full_clean()
         super().save(*args, **kwargs)
 
 
+class BookingLock(models.Model):
+    """Row locked while a booking is made, serialising reservations per (type, date)."""
+
+    appointment_type = models.CharField(max_length=20, choices=Appointment.APPOINTMENT_TYPE_CHOICES)
+    appointment_date = models.DateField()
+    version = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        verbose_name = 'Verrou de réservation'
+        verbose_name_plural = 'Verrous de réservation'
+        unique_together = ['appointment_type', 'appointment_date']
+
+    def __str__(self):
+        return f"{self.appointment_type} - {self.appointment_date}"
+
+
 class SentEmail(models.Model):
-    """Model to track follow-up emails sent from the dashboard."""
+    """Follow-up email from the dashboard, queued here and delivered by the outbox worker."""
+
+    STATUS_CHOICES = [
+        ('queued', 'En attente'),
+        ('sent', 'Envoyé'),
+        ('failed', 'Échec'),
+    ]
 
     appointment = models.ForeignKey(Appointment, on_delete=models.CASCADE, related_name='sent_emails')
     subject = models.CharField(max_length=200)
     body = models.TextField()
     recipient_email = models.EmailField()
-    sent_at = models.DateTimeField(auto_now_add=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
     sent_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='queued')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
 
     class Meta:
-        ordering = ['-sent_at']
+        ordering = ['-created_at']
         verbose_name = 'Email envoyé'
         verbose_name_plural = 'Emails envoyés'
+        indexes = [
+            # Outbox worker: due queued emails
+            models.Index(fields=['status', 'next_attempt_at'], name='sentemail_status_due_idx'),
+        ]
 
     def __str__(self):
-        return f"Email à {self.recipient_email} - {self.subject} ({self.sent_at.strftime('%d/%m/%Y')})"
+        return f"Email à {self.recipient_email} - {self.subject} ({self.created_at.strftime('%d/%m/%Y')})"
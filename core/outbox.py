@@ -0,0 +1,160 @@
+"""
+Outbound email queue.
+
+Views only insert queued SentEmail rows (one, or many at once with bulk_create) and
+return; the `send_queued_emails` worker delivers due rows in batches over one SMTP
+connection. A batch is claimed by pushing its
+next_attempt_at past a lease, so a second worker skips it and a crashed worker's batch
+becomes due again once the lease expires. Failed sends are retried with exponential
+backoff until MAX_ATTEMPTS, then marked failed.
+"""
+
+from datetime import timedelta
+import logging
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.template import Context, Template
+from django.utils.formats import date_format, time_format
+from django.utils import timezone
+
+from .models import SentEmail
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 50
+MAX_ATTEMPTS = 5
+# First retry after one minute, then 2, 4, 8... minutes
+BACKOFF_SECONDS = 60
+# A claimed batch is left alone by other workers for this long
+LEASE_SECONDS = 300
+
+
+def queue_email(appointment, subject, body, sent_by=None):
+    """Queue a follow-up email for an appointment and return its SentEmail row."""
+    return SentEmail.objects.create(
+        appointment=appointment,
+        subject=subject,
+        body=body,
+        recipient_email=appointment.email,
+        sent_by=sent_by,
+    )
+
+
+def _template_context(appointment):
+    return Context({
+        'nom': appointment.name,
+        'email': appointment.email,
+        'type': appointment.get_appointment_type_display(),
+        'date': date_format(appointment.appointment_date, 'd/m/Y'),
+        'heure': time_format(appointment.appointment_time, 'H:i'),
+    }, autoescape=False)
+
+
+def queue_bulk_emails(appointments, subject_template, body_template, sent_by=None, batch_size=500):
+    """
+    Queue one personalised email per appointment and return how many were queued.
+
+    The subject and body are Django template strings rendered per recipient with nom,
+    email, type, date and heure. Rows are written with bulk_create.
+    """
+    subject_template, body_template = Template(subject_template), Template(body_template)
+    emails = []
+    for appointment in appointments.iterator(chunk_size=batch_size):
+        context = _template_context(appointment)
+        emails.append(SentEmail(
+            appointment=appointment,
+            subject=subject_template.render(context).replace('\n', '').replace('\r', '')[:200],
+            body=body_template.render(context),
+            recipient_email=appointment.email,
+            sent_by=sent_by,
+        ))
+    SentEmail.objects.bulk_create(emails, batch_size=batch_size)
+    return len(emails)
+
+
+def retry_delay(attempts):
+    """Return the wait before the next try of an email that failed `attempts` times."""
+    return timedelta(seconds=BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+
+def _claim_batch(batch_size, now):
+    """Lease up to batch_size due emails to this worker and return them."""
+    with transaction.atomic():
+        ids = list(
+            SentEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status='queued', next_attempt_at__lte=now)
+            .order_by('next_attempt_at', 'pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        SentEmail.objects.filter(pk__in=ids).update(next_attempt_at=now + timedelta(seconds=LEASE_SECONDS))
+    return list(SentEmail.objects.filter(pk__in=ids).order_by('pk'))
+
+
+def send_queued(batch_size=BATCH_SIZE):
+    """
+    Deliver one batch of due emails over a single connection.
+
+    Returns a (sent, retried, failed) tuple of counts; (0, 0, 0) means the queue had
+    nothing due.
+    """
+    now = timezone.now()
+    batch = _claim_batch(batch_size, now)
+    if not batch:
+        return 0, 0, 0
+
+    sent = retried = failed = 0
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as e:
+        # Nothing can go out this round; every email counts one failed attempt
+        logger.error("Cannot open email connection", extra={'error': str(e)})
+        for email in batch:
+            if _record_failure(email, e, now):
+                failed += 1
+            else:
+                retried += 1
+        return sent, retried, failed
+
+    try:
+        for email in batch:
+            message = EmailMessage(
+                subject=email.subject,
+                body=email.body,
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[email.recipient_email],
+                connection=connection,
+            )
+            try:
+                message.send()
+            except Exception as e:
+                logger.error("Error sending email", extra={'email_id': email.pk, 'recipient': email.recipient_email, 'error': str(e)})
+                if _record_failure(email, e, now):
+                    failed += 1
+                else:
+                    retried += 1
+                continue
+            SentEmail.objects.filter(pk=email.pk).update(
+                status='sent', sent_at=timezone.now(), attempts=email.attempts + 1, last_error='',
+            )
+            sent += 1
+    finally:
+        connection.close()
+
+    logger.info("Outbox batch sent", extra={'sent': sent, 'retried': retried, 'failed': failed})
+    return sent, retried, failed
+
+
+def _record_failure(email, error, now):
+    """Count a failed attempt; return True when the email is given up on."""
+    attempts = email.attempts + 1
+    if attempts >= MAX_ATTEMPTS:
+        SentEmail.objects.filter(pk=email.pk).update(status='failed', attempts=attempts, last_error=str(error))
+        return True
+    SentEmail.objects.filter(pk=email.pk).update(
+        attempts=attempts, next_attempt_at=now + retry_delay(attempts), last_error=str(error),
+    )
+    return False
@@ -0,0 +1,72 @@
+"""
+Whole-page cache for the public marketing pages.
+
+Anonymous GETs are served from the cache. The only per-visitor part of those pages is
+the CSRF token of the booking/logout forms: it is stored as a placeholder and replaced
+with the visitor's own token on every hit (hole punching). Requests with pending flash
+messages, logged-in users (personalised navigation), POSTs and query strings are rendered
+normally: pages are keyed on their path alone, so arbitrary ?utm_...= variants cannot fill
+the cache.
+
+Cached pages are dropped on every `migrate` (i.e. on deploy) and otherwise expire after
+PAGE_CACHE_TIMEOUT seconds.
+"""
+
+from functools import wraps
+import re
+import uuid
+
+from django.conf import settings
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+
+PAGE_CACHE_TIMEOUT = getattr(settings, 'PAGE_CACHE_TIMEOUT', 3600)
+
+VERSION_KEY = 'page:v'
+
+CSRF_PLACEHOLDER = '__CSRF_TOKEN__'
+CSRF_INPUT = re.compile(r'(name="csrfmiddlewaretoken" value=")[^"]*(")')
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(VERSION_KEY, version, None)
+    return version
+
+
+def invalidate_page_cache():
+    """Drop every cached page."""
+    cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+
+def _cacheable(request):
+    if request.method != 'GET' or request.GET or request.user.is_authenticated:
+        return False
+    # Counting does not mark the messages as read, the page will still show them
+    return not len(get_messages(request))
+
+
+def cache_anonymous_page(view_func):
+    """Serve anonymous GETs of a view from the page cache, with the CSRF token hole-punched."""
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        if not _cacheable(request):
+            return view_func(request, *args, **kwargs)
+
+        key = f"page:{_version()}:{request.get_host()}:{request.path}"
+        html = cache.get(key)
+        if html is None:
+            response = view_func(request, *args, **kwargs)
+            if response.status_code != 200 or response.streaming:
+                return response
+            html = CSRF_INPUT.sub(rf'\g<1>{CSRF_PLACEHOLDER}\g<2>', response.content.decode(response.charset))
+            cache.set(key, html, PAGE_CACHE_TIMEOUT)
+            return response
+
+        # get_token() also makes the CSRF middleware (re)send the cookie
+        return HttpResponse(html.replace(CSRF_PLACEHOLDER, get_token(request)))
+    return wrapper
@@ -0,0 +1,103 @@
+"""
+Keyset (seek) pagination for appointment lists.
+
+Pages are addressed by the (appointment_date, appointment_time, id) of a boundary row
+instead of an OFFSET, so every page is an indexed range read of page_size rows no matter
+how deep into the history it is.
+"""
+
+from datetime import datetime
+
+from django.db.models import Q
+
+PAGE_SIZE = 25
+
+CURSOR_FORMAT = '%Y-%m-%dT%H:%M:%S'
+
+
+def encode_cursor(appointment):
+    """Return the cursor string of an appointment."""
+    moment = datetime.combine(appointment.appointment_date, appointment.appointment_time)
+    return f"{moment.strftime(CURSOR_FORMAT)}_{appointment.pk}"
+
+
+def decode_cursor(cursor):
+    """Return (date, time, id) from a cursor string, or None if it is malformed."""
+    try:
+        moment, pk = cursor.rsplit('_', 1)
+        moment = datetime.strptime(moment, CURSOR_FORMAT)
+        return moment.date(), moment.time(), int(pk)
+    except (AttributeError, ValueError):
+        return None
+
+
+def _before(key):
+    """Rows strictly before `key` in (date, time, id) order."""
+    day, moment, pk = key
+    return (
+        Q(appointment_date__lt=day)
+        | Q(appointment_date=day, appointment_time__lt=moment)
+        | Q(appointment_date=day, appointment_time=moment, pk__lt=pk)
+    )
+
+
+def _after(key):
+    """Rows strictly after `key` in (date, time, id) order."""
+    day, moment, pk = key
+    return (
+        Q(appointment_date__gt=day)
+        | Q(appointment_date=day, appointment_time__gt=moment)
+        | Q(appointment_date=day, appointment_time=moment, pk__gt=pk)
+    )
+
+
+class KeysetPage:
+    """One page of appointments, newest first, with cursors to its neighbours."""
+
+    def __init__(self, items, next_cursor=None, previous_cursor=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def has_other_pages(self):
+        return bool(self.next_cursor or self.previous_cursor)
+
+
+def paginate_appointments(queryset, after=None, before=None, page_size=PAGE_SIZE):
+    """
+    Return a KeysetPage of `queryset` ordered by date, time and id descending.
+
+    `after` continues past the row of that cursor (next page), `before` returns the rows
+    just ahead of it (previous page). One query of page_size + 1 rows either way.
+    """
+    descending = ('-appointment_date', '-appointment_time', '-pk')
+    ascending = ('appointment_date', 'appointment_time', 'pk')
+    after_key = decode_cursor(after) if after else None
+    before_key = decode_cursor(before) if before else None
+
+    if before_key:
+        rows = list(queryset.filter(_after(before_key)).order_by(*ascending)[:page_size + 1])
+        has_more = len(rows) > page_size
+        items = rows[:page_size][::-1]
+        return KeysetPage(
+            items,
+            next_cursor=encode_cursor(items[-1]) if items else None,
+            previous_cursor=encode_cursor(items[0]) if items and has_more else None,
+        )
+
+    if after_key:
+        queryset = queryset.filter(_before(after_key))
+    rows = list(queryset.order_by(*descending)[:page_size + 1])
+    items = rows[:page_size]
+    return KeysetPage(
+        items,
+        next_cursor=encode_cursor(items[-1]) if len(rows) > page_size else None,
+        previous_cursor=encode_cursor(items[0]) if items and after_key else None,
+    )
@@ -0,0 +1,170 @@
+"""
+Sliding-window rate limiting, shared by every worker through the cache.
+
+Each (scope, client) pair keeps one counter per fixed window. The request rate is estimated
+from the current window's count plus the previous window's, weighted by how much of it
+still overlaps the sliding window, so bursts at a window boundary cannot double the limit.
+Counters live in settings.RATELIMIT_CACHE, which every worker must share: Redis when
+REDIS_URL is set (cache.incr() is atomic there), otherwise a file cache shared by the
+workers of one server (its incr() reads then writes, so simultaneous requests may be
+undercounted by a few). `manage.py check --deploy` warns about a per-process cache, which
+would multiply every limit by the number of workers.
+
+Views opt in with the `ratelimit` decorator; settings.RATELIMITS holds the rate of every
+scope. A limited client gets 429 with Retry-After before the view (or the ORM) runs.
+"""
+
+from functools import wraps
+import inspect
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse, JsonResponse
+
+# Scope: "<requests>/<period>", period being s, m, h or d optionally preceded by a count (5m)
+DEFAULT_RATES = {
+    'login': '20/5m',
+    'login-failures': '5/5m',
+    'booking': '10/h',
+    'contact': '5/10m',
+    'slots': '120/m',
+}
+
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """Return (limit, period in seconds) of a rate such as '10/m' or '5/10m'."""
+    count, _, period = rate.partition('/')
+    multiplier = period[:-1] or '1'
+    return int(count), int(multiplier) * PERIODS[period[-1]]
+
+
+def client_ip(request):
+    """
+    The address of the client, as seen by the last of settings.RATELIMIT_PROXY_COUNT
+    trusted reverse proxies. Entries a client adds itself to X-Forwarded-For are ignored.
+    """
+    proxies = getattr(settings, 'RATELIMIT_PROXY_COUNT', 1)
+    forwarded = [ip.strip() for ip in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',') if ip.strip()]
+    if proxies and forwarded:
+        return forwarded[-min(proxies, len(forwarded))]
+    return request.META.get('REMOTE_ADDR')
+
+
+class RateLimit:
+    """Sliding-window counter of one scope, e.g. RateLimit('login').hit(ip)."""
+
+    def __init__(self, scope, rate=None):
+        self.scope = scope
+        self.rate = rate
+
+    @property
+    def cache(self):
+        return caches[getattr(settings, 'RATELIMIT_CACHE', 'default')]
+
+    def _params(self):
+        rate = self.rate or getattr(settings, 'RATELIMITS', {}).get(self.scope) or DEFAULT_RATES[self.scope]
+        return parse_rate(rate)
+
+    def _keys(self, ident, period, now):
+        window = int(now // period)
+        return f"rl:{self.scope}:{ident}:{window}", f"rl:{self.scope}:{ident}:{window - 1}"
+
+    def _estimate(self, current, previous, period, now):
+        overlap = 1 - (now % period) / period
+        return current + previous * overlap
+
+    def _retry_after(self, limit, current, previous, period, now):
+        """Seconds until the estimate drops back under the limit."""
+        elapsed = now % period
+        if previous and current < limit:
+            # The previous window's weight decays: wait until it is low enough
+            needed = (current + previous - limit) / previous * period
+            return max(1, math.ceil(needed - elapsed + 1))
+        return max(1, math.ceil(period - elapsed))
+
+    def hit(self, ident):
+        """
+        Count one request of `ident`. Returns None if it is allowed, or the number of
+        seconds to wait before retrying.
+        """
+        limit, period = self._params()
+        now = time.time()
+        current_key, previous_key = self._keys(ident, period, now)
+        # Create the counter, then increment it atomically (two windows of lifetime)
+        self.cache.add(current_key, 0, period * 2)
+        try:
+            current = self.cache.incr(current_key)
+        except ValueError:
+            # Expired between add() and incr()
+            self.cache.set(current_key, 1, period * 2)
+            current = 1
+        previous = self.cache.get(previous_key, 0)
+        if self._estimate(current, previous, period, now) <= limit:
+            return None
+        return self._retry_after(limit, current, previous, period, now)
+
+    def remaining(self, ident):
+        """How many more requests `ident` may make right now, without counting one."""
+        limit, period = self._params()
+        now = time.time()
+        current_key, previous_key = self._keys(ident, period, now)
+        counts = self.cache.get_many([current_key, previous_key])
+        estimate = self._estimate(counts.get(current_key, 0), counts.get(previous_key, 0), period, now)
+        return max(0, math.floor(limit - estimate))
+
+    def reset(self, ident):
+        """Forget the requests of `ident` (e.g. after a successful login)."""
+        limit, period = self._params()
+        self.cache.delete_many(self._keys(ident, period, time.time()))
+
+
+def too_many_requests(request, retry_after):
+    """The 429 response of a limited request, JSON for API clients."""
+    message = "Trop de requêtes. Veuillez réessayer dans quelques instants."
+    if request.accepts('text/html'):
+        response = HttpResponse(message, status=429, content_type='text/plain; charset=utf-8')
+    else:
+        response = JsonResponse({'error': 'rate_limited', 'message': message, 'retry_after': retry_after}, status=429)
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def ratelimit(scope, methods=None):
+    """
+    Limit a view per client IP with the rate of settings.RATELIMITS[scope].
+
+    Only requests whose method is in `methods` are counted (all methods by default).
+    Works on sync and async views. settings.RATELIMIT_ENABLED = False disables every limit.
+    """
+    limiter = RateLimit(scope)
+
+    def check(request):
+        if not getattr(settings, 'RATELIMIT_ENABLED', True):
+            return None
+        if methods and request.method not in methods:
+            return None
+        return limiter.hit(client_ip(request))
+
+    def decorator(view_func):
+        if inspect.iscoroutinefunction(view_func):
+            @wraps(view_func)
+            async def async_wrapper(request, *args, **kwargs):
+                retry_after = await sync_to_async(check, thread_sensitive=False)(request)
+                if retry_after:
+                    return too_many_requests(request, retry_after)
+                return await view_func(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            retry_after = check(request)
+            if retry_after:
+                return too_many_requests(request, retry_after)
+            return view_func(request, *args, **kwargs)
+        return wrapper
+    return decorator
@@ -0,0 +1,119 @@
+"""
+Atomic appointment reservation.
+
+A booking first writes the BookingLock row of its (type, date). The UPDATE takes a row lock
+on PostgreSQL (like select_for_update) and the database write lock on SQLite, so concurrent
+bookings of the same day are serialised before the overlap check runs. Lock contention is
+retried with exponential backoff; a lost race raises SlotTaken with the nearest free slots.
+"""
+
+from datetime import datetime, timedelta
+import logging
+import random
+import time
+
+from django.db import IntegrityError, OperationalError, transaction
+from django.db.models import F
+
+from .availability import get_availability_range
+from .models import Appointment, BookingLock
+
+logger = logging.getLogger(__name__)
+
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 0.05
+
+# How far ahead alternatives are looked up, and how many are suggested
+ALTERNATIVES_DAYS = 14
+ALTERNATIVES_COUNT = 3
+
+
+class SlotTaken(Exception):
+    """Raised when the requested slot was booked by someone else."""
+
+    def __init__(self, appointment, alternatives):
+        super().__init__("Ce créneau vient d'être réservé.")
+        self.appointment = appointment
+        self.alternatives = alternatives
+
+    def as_dict(self):
+        return {
+            'error': 'slot_taken',
+            'message': str(self),
+            'date': self.appointment.appointment_date.isoformat(),
+            'time': self.appointment.appointment_time.strftime('%H:%M'),
+            'alternatives': self.alternatives,
+        }
+
+
+def _lock_day(appointment_type, appointment_date):
+    """Write-lock the (type, date) lock row, creating it on first use."""
+    locked = BookingLock.objects.filter(
+        appointment_type=appointment_type, appointment_date=appointment_date,
+    ).update(version=F('version') + 1)
+    if not locked:
+        # A concurrent creation raises IntegrityError, which is retried
+        BookingLock.objects.create(appointment_type=appointment_type, appointment_date=appointment_date)
+
+
+def nearest_free_slots(appointment_type, appointment_date, appointment_time, count=ALTERNATIVES_COUNT):
+    """Return the free slots closest to the requested one, same day first."""
+    today = datetime.now().date()
+    start_date = max(appointment_date, today)
+    days = get_availability_range(appointment_type, start_date, start_date + timedelta(days=ALTERNATIVES_DAYS))
+    requested = appointment_time.hour * 60 + appointment_time.minute
+
+    candidates = []
+    for day, info in days.items():
+        for slot in info['available_slots']:
+            hour, minute = map(int, slot['time'].split(':'))
+            distance = ((day - appointment_date).days, abs(hour * 60 + minute - requested))
+            candidates.append((distance, day, slot))
+    candidates.sort(key=lambda candidate: candidate[0])
+
+    return [
+        {'date': day.isoformat(), 'time': slot['time'], 'display': slot['display']}
+        for _, day, slot in candidates[:count]
+    ]
+
+
+def reserve_appointment(appointment, max_attempts=MAX_ATTEMPTS):
+    """
+    Save a new appointment if its interval is still free.
+
+    Raises SlotTaken (with alternatives) if another booking got there first, and re-raises
+    the last OperationalError if the lock could not be obtained after max_attempts.
+    """
+    for attempt in range(1, max_attempts + 1):
+        try:
+            with transaction.atomic():
+                _lock_day(appointment.appointment_type, appointment.appointment_date)
+                if appointment.has_conflict():
+                    break
+                appointment.save()
+                return appointment
+        except IntegrityError:
+            # Either the lock row or the exact slot was created concurrently
+            if Appointment.objects.filter(
+                appointment_type=appointment.appointment_type,
+                appointment_date=appointment.appointment_date,
+                appointment_time=appointment.appointment_time,
+                status__in=Appointment.BLOCKING_STATUSES,
+            ).exists():
+                break
+        except OperationalError:
+            # Database locked: back off and retry
+            if attempt == max_attempts:
+                raise
+        appointment.pk = None
+        time.sleep(BACKOFF_SECONDS * (2 ** (attempt - 1)) * random.uniform(0.5, 1.5))
+    else:
+        raise OperationalError("Could not reserve the slot: database busy")
+
+    logger.info("Slot taken", extra={
+        'appointment_type': appointment.appointment_type,
+        'appointment_date': appointment.appointment_date, 'appointment_time': appointment.appointment_time,
+    })
+    raise SlotTaken(appointment, nearest_free_slots(
+        appointment.appointment_type, appointment.appointment_date, appointment.appointment_time,
+    ))
@@ -0,0 +1,96 @@
+"""Signal handlers for the core application."""
+
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_logged_out
+from django.core.signals import setting_changed
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_save, post_delete, post_migrate
+from django.dispatch import receiver
+
+from .models import Appointment
+from .availability import invalidate_availability
+from .slots import get_calendar
+from .stats import invalidate_stats
+from .pagecache import invalidate_page_cache
+from .metrics import record_query
+from .auth import invalidate_user
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_availability(sender, instance, **kwargs):
+    """Invalidate cached availability for the slot an appointment occupies (and occupied)."""
+    slots = {(instance.appointment_type, instance.appointment_date)}
+    if instance.loaded_slot:
+        slots.add(instance.loaded_slot)
+    for appointment_type, appointment_date in slots:
+        if appointment_type and appointment_date:
+            invalidate_availability(appointment_type, appointment_date)
+    instance.loaded_slot = (instance.appointment_type, instance.appointment_date)
+
+
+@receiver(post_save, sender=Appointment)
+@receiver(post_delete, sender=Appointment)
+def invalidate_appointment_stats(sender, instance, **kwargs):
+    """Invalidate cached dashboard statistics."""
+    invalidate_stats()
+
+
+@receiver(post_save, sender=get_user_model())
+@receiver(post_delete, sender=get_user_model())
+def invalidate_cached_user(sender, instance, **kwargs):
+    """Drop the cached user on any change (password included) or deletion."""
+    invalidate_user(instance.pk)
+
+
+@receiver(user_logged_out)
+def invalidate_user_on_logout(sender, request, user, **kwargs):
+    """Drop the cached user when it logs out."""
+    if user is not None:
+        invalidate_user(user.pk)
+
+
+@receiver(post_migrate)
+def invalidate_pages_on_deploy(sender, **kwargs):
+    """Drop cached marketing pages when the project is migrated (every deploy)."""
+    if sender.name == 'core':
+        invalidate_page_cache()
+
+
+@receiver(setting_changed)
+def reload_booking_calendar(sender, setting, **kwargs):
+    """Rebuild the slot calendar when BOOKING_CALENDAR is overridden (tests)."""
+    if setting == 'BOOKING_CALENDAR':
+        get_calendar.cache_clear()
+
+
+@receiver(connection_created)
+def apply_sqlite_pragmas(sender, connection, **kwargs):
+    """
+    Apply settings.SQLITE_PRAGMAS to each new SQLite connection, except journal_mode on the
+    files of settings.SQLITE_JOURNAL_MODE_EXCLUDE.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = getattr(settings, 'SQLITE_PRAGMAS', {})
+    if not pragmas:
+        return
+    excluded = {Path(name) for name in getattr(settings, 'SQLITE_JOURNAL_MODE_EXCLUDE', [])}
+    keep_journal_mode = Path(connection.settings_dict['NAME']) in excluded
+    with connection.cursor() as cursor:
+        for name, value in pragmas.items():
+            if not name.isidentifier():
+                raise ValueError(f"Invalid SQLite pragma name: {name}")
+            if name == 'journal_mode' and keep_journal_mode:
+                continue
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+
+@receiver(connection_created)
+def install_query_metrics(sender, connection, **kwargs):
+    """Count the queries of each request on every database connection (core/metrics.py)."""
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
@@ -0,0 +1,249 @@
+"""
+Slot engine for the booking calendar.
+
+Owns the opening-hours calendar (per-type hours, slot length, open weekdays, holidays and
+closures) and computes free slots. A day's slots are represented as a bitset (one bit per
+slot), so free slots for a whole range are obtained with a few mask operations per day.
+Bookings occupy every slot their [start, start + duration) interval overlaps.
+"""
+
+from bisect import bisect_left
+from datetime import date, datetime, time, timedelta
+from functools import lru_cache
+import hashlib
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+
+DEFAULT_CALENDAR = {
+    'slot_minutes': 60,
+    'weekdays': [0, 1, 2, 3, 4],  # Monday to Friday
+    'hours': {'default': ('09:00', '16:00')},
+    'holidays': [],
+    'closures': [],
+}
+
+WEEKDAY_NAMES = ['lundi', 'mardi', 'mercredi', 'jeudi', 'vendredi', 'samedi', 'dimanche']
+
+
+def _parse_time(value):
+    if isinstance(value, time):
+        return value
+    return datetime.strptime(value, '%H:%M').time()
+
+
+def _parse_date(value):
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d').date()
+
+
+def _minutes(value):
+    return value.hour * 60 + value.minute
+
+
+def minutes_to_time(minutes):
+    """Convert minutes since midnight to a time, capped at the end of the day."""
+    if minutes >= 24 * 60:
+        return time.max
+    return time(minutes // 60, minutes % 60)
+
+
+def format_hour(value):
+    """Format a time the French way: 9h, 9h30."""
+    return f"{value.hour}h{value.minute:02d}" if value.minute else f"{value.hour}h"
+
+
+class SlotCalendar:
+    """Opening-hours calendar and bitset slot computations."""
+
+    def __init__(self, slot_minutes=60, weekdays=(0, 1, 2, 3, 4), hours=None, holidays=(), closures=()):
+        self.slot_minutes = slot_minutes
+        self.weekdays = frozenset(weekdays)
+        self.hours = {
+            appointment_type: (_parse_time(start), _parse_time(end))
+            for appointment_type, (start, end) in (hours or DEFAULT_CALENDAR['hours']).items()
+        }
+        self.holidays = frozenset(_parse_date(day) for day in holidays)
+        self.closures = [(_parse_date(start), _parse_date(end)) for start, end in closures]
+        self._slots = {}
+        # Stable across processes; lets caches keyed on it survive config changes safely
+        self.fingerprint = hashlib.md5(repr((
+            slot_minutes, sorted(self.weekdays), sorted(self.hours.items()),
+            sorted(self.holidays), self.closures,
+        )).encode()).hexdigest()[:8]
+
+    @classmethod
+    def from_settings(cls):
+        config = {**DEFAULT_CALENDAR, **getattr(settings, 'BOOKING_CALENDAR', {})}
+        return cls(**config)
+
+    # --- Calendar ---
+
+    def opening_hours(self, appointment_type=None):
+        """Return the (opening, closing) times for an appointment type."""
+        return self.hours.get(appointment_type) or self.hours['default']
+
+    def is_open_weekday(self, day):
+        return day.weekday() in self.weekdays
+
+    def is_closed_date(self, day):
+        """Return True for holidays and closure periods."""
+        return day in self.holidays or any(start <= day <= end for start, end in self.closures)
+
+    def is_open_day(self, day):
+        return self.is_open_weekday(day) and not self.is_closed_date(day)
+
+    def weekdays_message(self):
+        days = sorted(self.weekdays)
+        if days == list(range(days[0], days[-1] + 1)):
+            return f"du {WEEKDAY_NAMES[days[0]]} au {WEEKDAY_NAMES[days[-1]]}"
+        return "le " + ", ".join(WEEKDAY_NAMES[day] for day in days)
+
+    def hours_message(self, appointment_type=None):
+        start, end = self.opening_hours(appointment_type)
+        return f"de {format_hour(start)} à {format_hour(end)}"
+
+    def validate_date(self, day):
+        """Raise ValidationError if no appointment can be booked on this day."""
+        if not self.is_open_weekday(day):
+            raise ValidationError(f"Les rendez-vous ne sont disponibles que {self.weekdays_message()}.")
+        if self.is_closed_date(day):
+            raise ValidationError("Nous sommes fermés à cette date. Veuillez choisir une autre date.")
+
+    def validate_time(self, appointment_type, slot_time, duration_minutes=None):
+        """Raise ValidationError if the time is not a slot start or the booking overruns closing time."""
+        start, end = self.opening_hours(appointment_type)
+        duration_minutes = duration_minutes or self.slot_minutes
+        if not self.is_within_hours(appointment_type, slot_time) or _minutes(slot_time) + duration_minutes > _minutes(end):
+            raise ValidationError(f"Les rendez-vous sont disponibles {self.hours_message(appointment_type)}.")
+        if self.slot_index(appointment_type, slot_time) is None:
+            raise ValidationError("Veuillez choisir l'un des créneaux proposés.")
+
+    # --- Slots ---
+
+    def slots(self, appointment_type=None):
+        """Return the sorted tuple of slot start times of an open day."""
+        key = appointment_type if appointment_type in self.hours else 'default'
+        if key not in self._slots:
+            start, end = self.opening_hours(key)
+            first, last = _minutes(start), _minutes(end)
+            self._slots[key] = tuple(
+                time(minute // 60, minute % 60)
+                for minute in range(first, last - self.slot_minutes + 1, self.slot_minutes)
+            )
+        return self._slots[key]
+
+    def slot_index(self, appointment_type, slot_time):
+        """Return the bit index of a slot start time, or None if it is not a slot boundary."""
+        start, _ = self.opening_hours(appointment_type)
+        offset = _minutes(slot_time) - _minutes(start)
+        if slot_time.second or offset % self.slot_minutes:
+            return None
+        index = offset // self.slot_minutes
+        return index if 0 <= index < len(self.slots(appointment_type)) else None
+
+    def is_within_hours(self, appointment_type, slot_time):
+        start, end = self.opening_hours(appointment_type)
+        return start <= slot_time < end
+
+    def open_mask(self, appointment_type=None):
+        return (1 << len(self.slots(appointment_type))) - 1
+
+    def span_mask(self, appointment_type, start_time, duration_minutes):
+        """Return the bitset of slots overlapping [start_time, start_time + duration)."""
+        opening, _ = self.opening_hours(appointment_type)
+        offset = _minutes(start_time) - _minutes(opening)
+        first = max(offset // self.slot_minutes, 0)
+        last = min(-(-(offset + duration_minutes) // self.slot_minutes), len(self.slots(appointment_type)))
+        if last <= first:
+            return 0
+        return ((1 << (last - first)) - 1) << first
+
+    def booked_masks(self, appointment_type, bookings):
+        """Fold (date, time, duration_hours) bookings into one bitset per date."""
+        masks = {}
+        for day, start_time, duration_hours in bookings:
+            masks[day] = masks.get(day, 0) | self.span_mask(appointment_type, start_time, duration_hours * 60)
+        return masks
+
+    def free_mask(self, appointment_type, day, booked_mask=0, duration_minutes=None):
+        """Return the bitset of slots where a booking of the given duration can start."""
+        if not self.is_open_day(day):
+            return 0
+        free = self.open_mask(appointment_type) & ~booked_mask
+        # A start is free only if the following n - 1 slots are free too
+        length = -(-(duration_minutes or self.slot_minutes) // self.slot_minutes)
+        starts = free
+        for shift in range(1, length):
+            starts &= free >> shift
+        return starts
+
+    def slots_from_mask(self, appointment_type, mask):
+        """Expand a bitset into the list of slot start times it contains."""
+        slots = self.slots(appointment_type)
+        result = []
+        while mask:
+            low = mask & -mask
+            result.append(slots[low.bit_length() - 1])
+            mask ^= low
+        return result
+
+    def free_slots(self, appointment_type, start_date, end_date, bookings, duration_minutes=None):
+        """
+        Return {date: [free start times]} for every day of an inclusive range.
+
+        `bookings` is an iterable of (date, time, duration_hours) triples occupying slots;
+        `duration_minutes` is the length of the booking being made (one slot by default).
+        """
+        masks = self.booked_masks(appointment_type, bookings)
+        result = {}
+        day = start_date
+        while day <= end_date:
+            mask = self.free_mask(appointment_type, day, masks.get(day, 0), duration_minutes)
+            result[day] = self.slots_from_mask(appointment_type, mask)
+            day += timedelta(days=1)
+        return result
+
+    def format_slot(self, slot_time, duration_minutes=None):
+        """Serialize a slot for the JSON API."""
+        end = _minutes(slot_time) + (duration_minutes or self.slot_minutes)
+        return {
+            'time': slot_time.strftime('%H:%M'),
+            'display': f"{slot_time.hour}:{slot_time.minute:02d} - {end // 60}:{end % 60:02d}",
+        }
+
+
+class IntervalIndex:
+    """
+    Sorted-array index over [start, end) minute intervals of one (type, date).
+
+    Intervals are sorted by start with a running maximum of their ends, so an overlap
+    query is a single binary search: among intervals starting before the query ends,
+    one overlaps iff the largest end exceeds the query start.
+    """
+
+    def __init__(self, intervals):
+        ordered = sorted(intervals)
+        self.starts = [start for start, _ in ordered]
+        self.max_ends = []
+        running = None
+        for _, end in ordered:
+            running = end if running is None else max(running, end)
+            self.max_ends.append(running)
+
+    @classmethod
+    def from_bookings(cls, bookings):
+        """Build the index from (time, duration_hours) pairs."""
+        return cls((_minutes(start), _minutes(start) + duration_hours * 60) for start, duration_hours in bookings)
+
+    def overlaps(self, start_time, duration_minutes):
+        start = _minutes(start_time)
+        index = bisect_left(self.starts, start + duration_minutes)
+        return index > 0 and self.max_ends[index - 1] > start
+
+
+@lru_cache(maxsize=1)
+def get_calendar():
+    """Return the calendar configured by settings.BOOKING_CALENDAR."""
+    return SlotCalendar.from_settings()
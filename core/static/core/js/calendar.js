@@ -14,11 +14,15 @@ document.addEventListener('DOMContentLoaded', function() {
 
     let currentAppointmentType = null;
 
+    // Availability for the whole booking window, keyed by type then by date (YYYY-MM-DD)
+    const availabilityCache = {};
+
     // Open booking modal
     bookingBtns.forEach(btn => {
         btn.addEventListener('click', function(e) {
             e.preventDefault();
             currentAppointmentType = this.dataset.type || getAppointmentTypeFromPage();
+            prefetchAvailability(currentAppointmentType);
             if (bookingModal) {
                 bookingModal.style.display = 'flex';
                 document.body.style.overflow = 'hidden';
@@ -48,19 +52,54 @@ document.addEventListener('DOMContentLoaded', function() {
     if (dateInput) {
         dateInput.addEventListener('change', function() {
             const selectedDate = this.value;
+            this.setCustomValidity('');
             if (selectedDate) {
                 fetchAvailableSlots(selectedDate, currentAppointmentType);
             }
         });
 
         // Set minimum date to today
-        const today = new Date().toISOString().split('T')[0];
+        const today = toISODate(new Date());
         dateInput.setAttribute('min', today);
 
         // Set maximum date to 3 months from now
         const maxDate = new Date();
         maxDate.setMonth(maxDate.getMonth() + 3);
-        dateInput.setAttribute('max', maxDate.toISOString().split('T')[0]);
+        dateInput.setAttribute('max', toISODate(maxDate));
+    }
+
+    /**
+     * Format a Date as YYYY-MM-DD
+     */
+    function toISODate(date) {
+        return date.toISOString().split('T')[0];
+    }
+
+    /**
+     * Fetch availability for the whole 3-month booking window in one request
+     */
+    function prefetchAvailability(type) {
+        if (!type || availabilityCache[type]) return availabilityCache[type];
+
+        const from = new Date();
+        const to = new Date();
+        to.setMonth(to.getMonth() + 3);
+
+        const url = `/api/available-slots/?type=${type}&from=${toISODate(from)}&to=${toISODate(to)}`;
+
+        availabilityCache[type] = fetch(url)
+            .then(response => {
+                if (!response.ok) throw new Error('Erreur lors du chargement des créneaux');
+                return response.json();
+            })
+            .then(data => data.days)
+            .catch(error => {
+                console.error('Error prefetching availability:', error);
+                delete availabilityCache[type];
+                return null;
+            });
+
+        return availabilityCache[type];
     }
 
     /**
@@ -69,6 +108,27 @@ document.addEventListener('DOMContentLoaded', function() {
     function fetchAvailableSlots(date, type) {
         if (!timeSlotsContainer) return;
 
+        const pending = prefetchAvailability(type);
+        if (pending) {
+            timeSlotsContainer.innerHTML = '<p class="loading-text">Chargement des créneaux disponibles...</p>';
+            pending.then(days => {
+                if (days && days[date]) {
+                    displayDay(days[date]);
+                } else {
+                    fetchSlotsForDate(date, type);
+                }
+            });
+            return;
+        }
+
+        fetchSlotsForDate(date, type);
+    }
+
+    /**
+     * Fetch available time slots for a single date (fallback when the range is unavailable)
+     */
+    function fetchSlotsForDate(date, type) {
+
         // Show loading state
         timeSlotsContainer.innerHTML = '<p class="loading-text">Chargement des créneaux disponibles...</p>';
 
@@ -93,6 +153,34 @@ document.addEventListener('DOMContentLoaded', function() {
             });
     }
 
+    /**
+     * Display a day of the prefetched range, flagging closed and fully booked dates
+     */
+    function displayDay(day) {
+        let message = null;
+        if (day.closed) {
+            message = 'Fermé à cette date. Veuillez choisir une autre date.';
+        } else if (day.full) {
+            message = 'Complet : tous les créneaux de cette date sont réservés. Veuillez choisir une autre date.';
+        }
+        if (!message) {
+            displayTimeSlots(day.available_slots);
+            return;
+        }
+
+        // The native date picker cannot disable single dates: block submitting this one instead
+        if (dateInput) {
+            dateInput.setCustomValidity(message);
+        }
+        if (timeInput) {
+            timeInput.value = '';
+        }
+        if (selectedTimeDisplay) {
+            selectedTimeDisplay.style.display = 'none';
+        }
+        timeSlotsContainer.innerHTML = `<p class="no-slots-text">${message}</p>`;
+    }
+
     /**
      * Display available time slots
      */
@@ -174,5 +262,6 @@ document.addEventListener('DOMContentLoaded', function() {
         bookingModal.style.display = 'flex';
         document.body.style.overflow = 'hidden';
         currentAppointmentType = getAppointmentTypeFromPage();
+        prefetchAvailability(currentAppointmentType);
     }
 });
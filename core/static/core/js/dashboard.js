@@ -1,42 +1,4 @@
 document.addEventListener('DOMContentLoaded', function() {
-    // --- Filter buttons for appointment list ---
-    const filterBtns = document.querySelectorAll('.filter-btn');
-    const tableRows = document.querySelectorAll('.appointments-table tbody tr');
-    const cards = document.querySelectorAll('.appointment-card');
-
-    filterBtns.forEach(btn => {
-        btn.addEventListener('click', function() {
-            // Update active state
-            filterBtns.forEach(b => b.classList.remove('active'));
-            this.classList.add('active');
-
-            const filter = this.dataset.filter;
-
-            // Filter table rows (desktop)
-            tableRows.forEach(row => {
-                if (!row.dataset.type) return; // Skip empty state rows
-                if (filter === 'all') {
-                    row.style.display = '';
-                } else if (['formation', 'livrables'].includes(filter)) {
-                    row.style.display = row.dataset.type === filter ? '' : 'none';
-                } else {
-                    row.style.display = row.dataset.status === filter ? '' : 'none';
-                }
-            });
-
-            // Filter cards (mobile)
-            cards.forEach(card => {
-                if (filter === 'all') {
-                    card.style.display = '';
-                } else if (['formation', 'livrables'].includes(filter)) {
-                    card.style.display = card.dataset.type === filter ? '' : 'none';
-                } else {
-                    card.style.display = card.dataset.status === filter ? '' : 'none';
-                }
-            });
-        });
-    });
-
     // --- Confirm before status change ---
     const statusSelects = document.querySelectorAll('.status-select');
     statusSelects.forEach(select => {
@@ -58,6 +20,34 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     });
 
+    // --- Bulk status change ---
+    const bulkForm = document.getElementById('bulk-status-form');
+    if (bulkForm) {
+        const selectPage = document.querySelector('.bulk-select-page');
+        const rowBoxes = document.querySelectorAll('.bulk-select');
+        if (selectPage) {
+            selectPage.addEventListener('change', function() {
+                rowBoxes.forEach(box => { box.checked = this.checked; });
+            });
+        }
+
+        bulkForm.addEventListener('submit', function(e) {
+            const status = bulkForm.querySelector('.bulk-status-select');
+            const all = bulkForm.querySelector('input[name="all"]').checked;
+            const selected = document.querySelectorAll('.bulk-select:checked').length;
+            if (!status.value || (!all && !selected)) {
+                e.preventDefault();
+                alert('Choisissez un statut et au moins un rendez-vous.');
+                return;
+            }
+            const target = all ? 'tous les rendez-vous du filtre' : selected + ' rendez-vous';
+            const label = status.options[status.selectedIndex].text.toLowerCase();
+            if (!confirm('Voulez-vous vraiment ' + label + ' ' + target + ' ?')) {
+                e.preventDefault();
+            }
+        });
+    }
+
     // --- Auto-dismiss success/error messages after 5 seconds ---
     const alerts = document.querySelectorAll('.alert');
     alerts.forEach(alert => {
@@ -0,0 +1,103 @@
+"""
+Appointment statistics for the dashboard.
+
+Counters come from one conditional-aggregation query and breakdowns from one grouped
+query each. Results are cached under a shared version token that is replaced whenever an
+appointment is created, changed or deleted, like the availability cache. As for
+availability, a per-process cache could not carry that token to the other workers: without
+a shared cache (settings.SHARED_CACHE) the statistics are computed on every request.
+"""
+
+from datetime import timedelta
+import uuid
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F, Q
+from django.db.models.functions import TruncWeek
+
+from .cache_backends import cache_is_shared
+from .models import Appointment
+
+STATS_CACHE_TIMEOUT = getattr(settings, 'STATS_CACHE_TIMEOUT', 3600)
+
+VERSION_KEY = 'stats:v'
+
+
+def _version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = uuid.uuid4().hex
+        cache.set(VERSION_KEY, version, None)
+    return version
+
+
+def _cached(name, compute):
+    if not cache_is_shared():
+        return compute()
+    key = f"stats:{name}:{_version()}"
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, STATS_CACHE_TIMEOUT)
+    return value
+
+
+def invalidate_stats():
+    """Drop every cached statistic, now and once the current transaction commits."""
+    def bump():
+        cache.set(VERSION_KEY, uuid.uuid4().hex, None)
+
+    bump()
+    transaction.on_commit(bump)
+
+
+def _compute_counts():
+    return Appointment.objects.aggregate(
+        total_count=Count('pk'),
+        pending_count=Count('pk', filter=Q(status='pending')),
+        confirmed_count=Count('pk', filter=Q(status='confirmed')),
+        cancelled_count=Count('pk', filter=Q(status='cancelled')),
+        completed_count=Count('pk', filter=Q(status='completed')),
+        formation_count=Count('pk', filter=Q(appointment_type='formation')),
+        livrables_count=Count('pk', filter=Q(appointment_type='livrables')),
+    )
+
+
+def get_dashboard_stats():
+    """Return the dashboard header counters (total, per status, per type)."""
+    return _cached('counts', _compute_counts)
+
+
+def _breakdown(period, start_date, end_date):
+    rows = (
+        Appointment.objects
+        .filter(appointment_date__range=(start_date, end_date))
+        .annotate(period=period)
+        .values('period')
+        .annotate(
+            total=Count('pk'),
+            formation=Count('pk', filter=Q(appointment_type='formation')),
+            livrables=Count('pk', filter=Q(appointment_type='livrables')),
+        )
+        .order_by('period')
+    )
+    return [{**row, 'period': row['period'].isoformat()} for row in rows]
+
+
+def get_daily_breakdown(start_date, end_date):
+    """Return appointments per day (total and per type) between two dates, inclusive."""
+    return _cached(
+        f"daily:{start_date.isoformat()}:{end_date.isoformat()}",
+        lambda: _breakdown(F('appointment_date'), start_date, end_date),
+    )
+
+
+def get_weekly_breakdown(start_date, end_date):
+    """Return appointments per week (keyed by its Monday) between two dates, inclusive."""
+    start_date -= timedelta(days=start_date.weekday())
+    return _cached(
+        f"weekly:{start_date.isoformat()}:{end_date.isoformat()}",
+        lambda: _breakdown(TruncWeek('appointment_date'), start_date, end_date),
+    )
@@ -0,0 +1,109 @@
+"""
+Appointment status transitions from the dashboard, one row or many at once.
+
+Every change is a single UPDATE per batch of ids, followed by one admin LogEntry per
+changed appointment (written with bulk_create) and one round of cache invalidation.
+Reactivating appointments (into a blocking status) takes the reservation lock of each
+affected (type, date) first and checks their intervals against the active bookings, as
+a new reservation would.
+"""
+
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.contenttypes.models import ContentType
+from collections import defaultdict
+
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+
+from .availability import invalidate_availability_days
+from .models import Appointment
+from .reservations import _lock_day
+from .slots import IntervalIndex
+from .stats import invalidate_stats
+
+# Ids per UPDATE, kept well under SQLite's bound-parameter limit
+BATCH_SIZE = 500
+
+
+class StatusConflict(IntegrityError):
+    """Reactivating `appointments` would overlap active bookings; nothing was changed."""
+
+    def __init__(self, appointments):
+        super().__init__("Appointments overlap active bookings")
+        self.appointments = appointments
+
+
+def _check_overlaps(reactivated):
+    """
+    Lock the days of the appointments being reactivated and raise StatusConflict with
+    those overlapping an active booking (or one reactivated before them).
+    """
+    days = defaultdict(list)
+    for appointment in reactivated:
+        days[(appointment.appointment_type, appointment.appointment_date)].append(appointment)
+
+    conflicts = []
+    ids = [appointment.pk for appointment in reactivated]
+    for (appointment_type, appointment_date), appointments in sorted(days.items()):
+        _lock_day(appointment_type, appointment_date)
+        bookings = list(
+            Appointment.objects.filter(
+                appointment_type=appointment_type,
+                appointment_date=appointment_date,
+                status__in=Appointment.BLOCKING_STATUSES,
+            ).exclude(pk__in=ids).values_list('appointment_time', 'duration_hours')
+        )
+        for appointment in sorted(appointments, key=lambda a: a.appointment_time):
+            if IntervalIndex.from_bookings(bookings).overlaps(appointment.appointment_time, appointment.duration_minutes):
+                conflicts.append(appointment)
+            else:
+                bookings.append((appointment.appointment_time, appointment.duration_hours or 1))
+    if conflicts:
+        raise StatusConflict(conflicts)
+
+
+def update_status(queryset, new_status, user):
+    """
+    Move every appointment of `queryset` to `new_status` and return how many changed.
+
+    Appointments already in that status are left alone. Raises ValueError for an unknown
+    status and StatusConflict, an IntegrityError, (nothing changed) if reactivating some
+    would overlap active bookings.
+    """
+    labels = dict(Appointment.STATUS_CHOICES)
+    if new_status not in labels:
+        raise ValueError(f"Unknown status: {new_status}")
+
+    changed = list(
+        queryset.exclude(status=new_status)
+        .order_by()
+        .only('pk', 'name', 'appointment_type', 'appointment_date', 'appointment_time', 'duration_hours', 'status')
+    )
+    if not changed:
+        return 0
+
+    now = timezone.now()
+    content_type = ContentType.objects.get_for_model(Appointment)
+    with transaction.atomic():
+        if new_status in Appointment.BLOCKING_STATUSES:
+            _check_overlaps([a for a in changed if a.status not in Appointment.BLOCKING_STATUSES])
+        for start in range(0, len(changed), BATCH_SIZE):
+            ids = [appointment.pk for appointment in changed[start:start + BATCH_SIZE]]
+            Appointment.objects.filter(pk__in=ids).update(status=new_status, updated_at=now)
+
+        LogEntry.objects.bulk_create([
+            LogEntry(
+                action_time=now,
+                user_id=user.pk,
+                content_type_id=content_type.pk,
+                object_id=str(appointment.pk),
+                object_repr=str(appointment)[:200],
+                action_flag=CHANGE,
+                change_message=f"Statut : {labels[appointment.status]} → {labels[new_status]}",
+            )
+            for appointment in changed
+        ], batch_size=BATCH_SIZE)
+
+    invalidate_availability_days({(appointment.appointment_type, appointment.appointment_date) for appointment in changed})
+    invalidate_stats()
+    return len(changed)
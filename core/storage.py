@@ -0,0 +1,23 @@
+"""Static files storage used by collectstatic."""
+
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+from .bundles import build_bundles
+from .images import build_variants
+
+
+class CoreStaticFilesStorage(CompressedManifestStaticFilesStorage):
+    """
+    WhiteNoise's hashed and compressed storage, plus CSS/JS bundles and responsive images.
+
+    Before hashing, the STATIC_BUNDLES are concatenated and minified (see core.bundles) so
+    they are hashed and compressed like any other file. After it, AVIF/WebP variants of
+    every image under core/images are generated (see core.images).
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            build_bundles(self, paths)
+        yield from super().post_process(paths, dry_run, **options)
+        if not dry_run:
+            build_variants(self, paths)
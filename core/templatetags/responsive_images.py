@@ -0,0 +1,40 @@
+"""Template tags for responsive images."""
+
+from urllib.parse import quote
+
+from django import template
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.forms.utils import flatatt
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+
+from core.images import load_variants
+
+register = template.Library()
+
+MIME_TYPES = {'avif': 'image/avif', 'webp': 'image/webp'}
+
+
+@register.simple_tag
+def responsive_image(path, alt='', sizes='100vw', **attrs):
+    """
+    Render a static image as a <picture> with AVIF/WebP srcsets and a lazy <img> fallback.
+
+    Usage: {% responsive_image 'core/images/logo.jpg' alt="Logo" sizes="200px" class="logo" %}
+    Extra keyword arguments become <img> attributes; pass loading="eager" for the largest
+    image above the fold. Without generated variants a plain lazy <img> is rendered.
+    """
+    entry = load_variants().get(path)
+    img_attrs = {'loading': 'lazy', 'decoding': 'async', **attrs}
+    if entry:
+        img_attrs.setdefault('width', entry['width'])
+        img_attrs.setdefault('height', entry['height'])
+    img = format_html('<img src="{}" alt="{}"{}>', static(path), alt, flatatt(img_attrs))
+    if not entry:
+        return img
+
+    sources = format_html_join('', '<source type="{}" srcset="{}" sizes="{}">', (
+        (MIME_TYPES[extension], ', '.join(f"{staticfiles_storage.base_url}{quote(name)} {width}w" for width, name in variants), sizes)
+        for extension, variants in entry['sources'].items() if variants
+    ))
+    return format_html('<picture>{}{}</picture>', sources, img)
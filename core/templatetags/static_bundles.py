@@ -0,0 +1,28 @@
+"""Template tags for the CSS/JS bundles built by collectstatic."""
+
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html_join
+
+from core.bundles import bundle_is_built, get_bundles
+
+register = template.Library()
+
+
+@register.simple_tag
+def static_bundle(name):
+    """
+    Render the <link> or <script> tag of a STATIC_BUNDLES entry.
+
+    Usage: {% static_bundle 'core/css/site.bundle.css' %}
+    In DEBUG, or before collectstatic has built the bundle, one tag per source file is
+    rendered instead.
+    """
+    if not settings.DEBUG and bundle_is_built(name):
+        files = [name]
+    else:
+        files = get_bundles()[name]
+    if name.endswith('.css'):
+        return format_html_join('\n    ', '<link rel="stylesheet" href="{}">', ((static(path),) for path in files))
+    return format_html_join('\n    ', '<script src="{}"></script>', ((static(path),) for path in files))
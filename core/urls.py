@@ -1,5 +1,9 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# The API views have async versions, routed to when running under ASGI (btp_project/asgi.py)
+api_views = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
     path('', views.index, name='index'),
@@ -7,8 +11,12 @@ urlpatterns = [
     path('livrables/', views.livrables, name='livrables'),
     path('contact/', views.contact, name='contact'),
     path('inscription/', views.inscription, name='inscription'),
+    # Project documents
+    path('documents/<slug:slug>.pdf', views.document_file, name='document_file'),
+    path('documents/<slug:slug>/apercus/<str:name>', views.document_thumbnail, name='document_thumbnail'),
     # API endpoints
-    path('api/available-slots/', views.get_available_slots, name='api_available_slots'),
+    path('api/available-slots/', api_views.get_available_slots, name='api_available_slots'),
+    path('api/reservations/', api_views.book_appointment, name='api_book_appointment'),
     # User appointments
     path('mes-rendez-vous/', views.mes_rendez_vous, name='mes_rendez_vous'),
     # Authentication
@@ -16,8 +24,13 @@ urlpatterns = [
     path('deconnexion/', views.deconnexion_view, name='dashboard_logout'),
     # Client Dashboard
     path('tableau-de-bord/', views.dashboard_home, name='dashboard_home'),
+    path('tableau-de-bord/emails/', views.dashboard_bulk_email, name='dashboard_bulk_email'),
     path('tableau-de-bord/rendez-vous/<int:pk>/email/', views.dashboard_send_email, name='dashboard_send_email'),
+    path('tableau-de-bord/rendez-vous/statut/', views.dashboard_bulk_status, name='dashboard_bulk_status'),
     path('tableau-de-bord/rendez-vous/<int:pk>/statut/', views.dashboard_update_status, name='dashboard_update_status'),
+    path('tableau-de-bord/export/<slug:kind>.csv', views.dashboard_export, name='dashboard_export'),
     path('tableau-de-bord/mot-de-passe/', views.DashboardPasswordChangeView.as_view(), name='dashboard_password_change'),
     path('tableau-de-bord/mot-de-passe/fait/', views.DashboardPasswordDoneView.as_view(), name='dashboard_password_done'),
+    # Monitoring
+    path('metrics', views.metrics, name='metrics'),
 ]
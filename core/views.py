@@ -1,97 +1,186 @@
 from django.shortcuts import render, redirect, get_object_or_404
-from .forms import InscriptionForm, ContactForm, AppointmentForm, FollowUpEmailForm
-from .models import Appointment, SentEmail
+from .forms import InscriptionForm, ContactForm, AppointmentForm, FollowUpEmailForm, BulkEmailForm
+from .models import Appointment
+from .slots import get_calendar
+from .reservations import SlotTaken, reserve_appointment
+from .outbox import queue_email, queue_bulk_emails
+from .pagination import paginate_appointments
+from .stats import get_dashboard_stats
+from .status import StatusConflict, update_status
+from .exports import EXPORTS, csv_response
+from .pagecache import cache_anonymous_page
+from .ratelimit import RateLimit, client_ip, ratelimit
+from .availability import MAX_RANGE_DAYS, availability_etag, get_availability_range
+from .metrics import collect as collect_metrics, render as render_metrics
+from .documents import FileRange, RangeNotSatisfiable, document_list, fingerprint, get_document, get_preview, parse_range, preview_dir
 from django.contrib import messages
+from django.contrib.messages import get_messages
 from django.contrib.auth import login, authenticate, logout
 from django.contrib.auth.views import PasswordChangeView, PasswordChangeDoneView
 from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.http import JsonResponse
-from django.views.decorators.http import require_http_methods
-from django.core.mail import send_mail
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse
+from django.views.decorators.http import condition, require_http_methods
+from django.views.decorators.cache import cache_control
+from django.urls import reverse, reverse_lazy
+from django.utils.http import quote_etag, url_has_allowed_host_and_scheme, urlencode
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError
+from django.db.models import Count, Max
 from django.conf import settings
-from django.urls import reverse_lazy
-from django.utils.http import url_has_allowed_host_and_scheme
-from django.core.cache import cache
-from datetime import datetime, time, timedelta
+from datetime import datetime
 from functools import wraps
+import hashlib
+import hmac
 import logging
-import json
+import os
 
-# Rate limiting constants
-MAX_LOGIN_ATTEMPTS = 5
-LOGIN_LOCKOUT_SECONDS = 300  # 5 minutes
+# Failed logins allowed per client IP (settings.RATELIMITS['login-failures'])
+LOGIN_FAILURES = RateLimit('login-failures')
 
 logger = logging.getLogger(__name__)
 
 
+@cache_anonymous_page
 def landing(request):
     """Render the landing page."""
     return render(request, 'core/landing.html')
 
 
+@cache_anonymous_page
 def index(request):
     """Render the index/portfolio page."""
     return render(request, 'core/index.html')
 
 
-def formation(request):
+def _book_appointment(request, appointment_type, template_name, success_message, context=None):
     """
-    Render the training programs page with booking functionality.
-    GET: Display formations and booking form
-    POST: Process booking submission
+    Shared GET/POST handling of the formation and livrables booking forms.
+    The slot is claimed through the reservation service; if it was just taken the form is
+    re-rendered (HTTP 409) with the nearest free slots, or returned as JSON to API clients.
     """
+    status = 200
     if request.method == "POST":
-        form = AppointmentForm(request.POST)
+        form = AppointmentForm(request.POST, appointment_type=appointment_type)
         if form.is_valid():
+            appointment = form.save(commit=False)
+            appointment.appointment_type = appointment_type
+            if request.user.is_authenticated:
+                appointment.user = request.user
             try:
-                appointment = form.save(commit=False)
-                appointment.appointment_type = 'formation'
-                if request.user.is_authenticated:
-                    appointment.user = request.user
-                appointment.save()
-                messages.success(request, "Votre rendez-vous pour la formation a été enregistré avec succès ! Nous vous contacterons bientôt.")
-                logger.info(f"Formation appointment booked: {appointment.name} - {appointment.appointment_date} at {appointment.appointment_time}")
-                return redirect('formation')
+                reserve_appointment(appointment)
+                messages.success(request, success_message)
+                logger.info("Appointment booked", extra={
+                    'appointment_id': appointment.pk, 'appointment_type': appointment_type,
+                    'appointment_date': appointment.appointment_date, 'appointment_time': appointment.appointment_time,
+                })
+                return redirect(appointment_type)
+            except SlotTaken as e:
+                if not request.accepts('text/html'):
+                    return JsonResponse(e.as_dict(), status=409)
+                suggestions = ", ".join(f"{alt['date']} à {alt['time']}" for alt in e.alternatives)
+                message = "Ce créneau vient d'être réservé."
+                if suggestions:
+                    message += f" Créneaux les plus proches disponibles : {suggestions}."
+                form.add_error('appointment_time', message)
+                messages.error(request, message)
+                status = 409
             except Exception as e:
-                logger.error(f"Error booking formation appointment: {str(e)}")
+                logger.error("Error booking appointment", extra={'appointment_type': appointment_type, 'error': str(e)})
                 messages.error(request, "Une erreur s'est produite lors de la réservation. Veuillez réessayer.")
         else:
             messages.error(request, "Veuillez corriger les erreurs dans le formulaire.")
     else:
-        form = AppointmentForm()
+        form = AppointmentForm(appointment_type=appointment_type)
+
+    return render(request, template_name, {'form': form, **(context or {})}, status=status)
 
-    return render(request, 'core/formation.html', {'form': form})
+
+@ratelimit('booking', methods=['POST'])
+@cache_anonymous_page
+def formation(request):
+    """
+    Render the training programs page with booking functionality.
+    GET: Display formations and booking form
+    POST: Process booking submission
+    """
+    return _book_appointment(
+        request, 'formation', 'core/formation.html',
+        "Votre rendez-vous pour la formation a été enregistré avec succès ! Nous vous contacterons bientôt.",
+    )
 
 
+@ratelimit('booking', methods=['POST'])
+@cache_anonymous_page
 def livrables(request):
     """
     Render the deliverables/projects page with booking functionality.
     GET: Display livrables and booking form
     POST: Process booking submission
     """
-    if request.method == "POST":
-        form = AppointmentForm(request.POST)
-        if form.is_valid():
-            try:
-                appointment = form.save(commit=False)
-                appointment.appointment_type = 'livrables'
-                if request.user.is_authenticated:
-                    appointment.user = request.user
-                appointment.save()
-                messages.success(request, "Votre rendez-vous pour les livrables a été enregistré avec succès ! Nous vous contacterons bientôt.")
-                logger.info(f"Livrables appointment booked: {appointment.name} - {appointment.appointment_date} at {appointment.appointment_time}")
-                return redirect('livrables')
-            except Exception as e:
-                logger.error(f"Error booking livrables appointment: {str(e)}")
-                messages.error(request, "Une erreur s'est produite lors de la réservation. Veuillez réessayer.")
-        else:
-            messages.error(request, "Veuillez corriger les erreurs dans le formulaire.")
-    else:
-        form = AppointmentForm()
+    return _book_appointment(
+        request, 'livrables', 'core/livrables.html',
+        "Votre rendez-vous pour les livrables a été enregistré avec succès ! Nous vous contacterons bientôt.",
+        context={'documents': document_list()},
+    )
+
+
+def _document_etag(request, slug):
+    document = get_document(slug)
+    return fingerprint(document['path']) if document else None
+
 
-    return render(request, 'core/livrables.html', {'form': form})
+@require_http_methods(["GET", "HEAD"])
+@cache_control(public=True, max_age=3600)
+@condition(etag_func=_document_etag)
+def document_file(request, slug):
+    """
+    Stream a project document (see core/documents.py).
+    A single byte range (Range header) is answered with 206 Partial Content, unless
+    If-Range shows the client holds another version of the file.
+    """
+    document = get_document(slug)
+    if document is None:
+        raise Http404("Document introuvable")
+
+    size = os.path.getsize(document['path'])
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except RangeNotSatisfiable:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f"bytes */{size}"
+        return response
+    if_range = request.headers.get('If-Range')
+    if byte_range and if_range and if_range != quote_etag(fingerprint(document['path'])):
+        byte_range = None
+
+    file = open(document['path'], 'rb')
+    filename = f"{slug}.pdf"
+    if byte_range is None:
+        response = FileResponse(file, content_type='application/pdf', filename=filename)
+    else:
+        start, end = byte_range
+        file.seek(start)
+        response = FileResponse(FileRange(file, end - start + 1), status=206, content_type='application/pdf', filename=filename)
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f"bytes {start}-{end}/{size}"
+    response['Accept-Ranges'] = 'bytes'
+    return response
+
+
+@require_http_methods(["GET", "HEAD"])
+@cache_control(public=True, max_age=365 * 24 * 3600, immutable=True)
+def document_thumbnail(request, slug, name):
+    """
+    Serve a page thumbnail; names carry the document version so they never change.
+    Previews are never rendered here: thumbnails only exist once the index was built.
+    """
+    preview = get_preview(slug, build=False)
+    if preview is None or name not in {page.get('thumbnail') for page in preview['pages']}:
+        raise Http404("Aperçu introuvable")
+    return FileResponse(open(os.path.join(preview_dir(slug), name), 'rb'), content_type='image/png')
 
 
+@ratelimit('contact', methods=['POST'])
 def contact(request):
     """
     Handle contact form submission.
@@ -104,10 +193,10 @@ def contact(request):
             try:
                 form.save()
                 messages.success(request, "Message envoyé avec succès !")
-                logger.info(f"Contact message received from {form.cleaned_data['email']}")
+                logger.info("Contact message received", extra={'email': form.cleaned_data['email']})
                 return redirect('contact')
             except Exception as e:
-                logger.error(f"Error saving contact message: {str(e)}")
+                logger.error("Error saving contact message", extra={'error': str(e)})
                 messages.error(request, "Une erreur s'est produite. Veuillez réessayer.")
         else:
             messages.error(request, "Veuillez corriger les erreurs dans le formulaire.")
@@ -130,10 +219,10 @@ def inscription(request):
                 user = form.save()
                 login(request, user)
                 messages.success(request, "Inscription réussie ! Bienvenue.")
-                logger.info(f"New user registered: {user.username}")
+                logger.info("New user registered", extra={'username': user.username})
                 return redirect('index')
             except Exception as e:
-                logger.error(f"Error during registration: {str(e)}")
+                logger.error("Error during registration", extra={'error': str(e)})
                 messages.error(request, "Une erreur s'est produite lors de l'inscription.")
         else:
             messages.error(request, "Veuillez corriger les erreurs dans le formulaire.")
@@ -143,67 +232,188 @@ def inscription(request):
     return render(request, 'core/inscription.html', {'form': form})
 
 
-@require_http_methods(["GET"])
-def get_available_slots(request):
+def _slots_query(request):
     """
-    API endpoint to get available time slots for a specific date and appointment type.
-    Query params: date (YYYY-MM-DD), type (formation|livrables)
+    Validate the query of the available slots API.
+    Returns a dict with the appointment type, the inclusive date range and whether a range
+    was requested, or the JsonResponse (400) describing the problem.
     """
+    appointment_type = request.GET.get('type')
     try:
-        date_str = request.GET.get('date')
-        appointment_type = request.GET.get('type')
+        if request.GET.get('from') or request.GET.get('to'):
+            from_str = request.GET.get('from')
+            to_str = request.GET.get('to')
+            if not from_str or not to_str or not appointment_type:
+                return JsonResponse({'error': 'From, to and type parameters are required'}, status=400)
+            if appointment_type not in dict(Appointment.APPOINTMENT_TYPE_CHOICES):
+                return JsonResponse({'error': 'Type de rendez-vous invalide.'}, status=400)
+
+            start_date = datetime.strptime(from_str, '%Y-%m-%d').date()
+            end_date = datetime.strptime(to_str, '%Y-%m-%d').date()
+            if end_date < start_date:
+                return JsonResponse({'error': 'La date de fin doit être postérieure à la date de début.'}, status=400)
+            if (end_date - start_date).days > MAX_RANGE_DAYS:
+                return JsonResponse({'error': f'La période demandée ne peut pas dépasser {MAX_RANGE_DAYS} jours.'}, status=400)
+
+            # Past days are never bookable
+            start_date = max(start_date, datetime.now().date())
+            return {'type': appointment_type, 'start': start_date, 'end': end_date, 'range': True}
 
+        date_str = request.GET.get('date')
         if not date_str or not appointment_type:
             return JsonResponse({'error': 'Date and type parameters are required'}, status=400)
+        if appointment_type not in dict(Appointment.APPOINTMENT_TYPE_CHOICES):
+            return JsonResponse({'error': 'Type de rendez-vous invalide.'}, status=400)
 
-        # Parse the date
         appointment_date = datetime.strptime(date_str, '%Y-%m-%d').date()
+    except ValueError as e:
+        logger.error("Invalid date format", extra={'error': str(e)})
+        return JsonResponse({'error': 'Format de date invalide. Utilisez YYYY-MM-DD.'}, status=400)
 
-        # Check if date is valid (not weekend, not in past)
-        if appointment_date.weekday() >= 5:
-            return JsonResponse({'error': 'Les rendez-vous ne sont disponibles que du lundi au vendredi.'}, status=400)
-
-        if appointment_date < datetime.now().date():
-            return JsonResponse({'error': 'La date ne peut pas être dans le passé.'}, status=400)
-
-        # Get all booked appointments for this date and type
-        booked_appointments = Appointment.objects.filter(
-            appointment_date=appointment_date,
-            appointment_type=appointment_type,
-            status__in=['pending', 'confirmed']
-        ).values_list('appointment_time', flat=True)
-
-        booked_times = set(booked_appointments)
-
-        # Generate all possible time slots (9:00 to 15:00, each hour)
-        available_slots = []
-        for hour in range(9, 16):  # 9 to 15 (last slot at 15:00)
-            slot_time = time(hour, 0)
-            if slot_time not in booked_times:
-                available_slots.append({
-                    'time': slot_time.strftime('%H:%M'),
-                    'display': f"{hour}:00 - {hour+1}:00"
-                })
+    # Check if date is valid (open day, not in past)
+    try:
+        get_calendar().validate_date(appointment_date)
+    except ValidationError as e:
+        return JsonResponse({'error': e.messages[0]}, status=400)
+
+    if appointment_date < datetime.now().date():
+        return JsonResponse({'error': 'La date ne peut pas être dans le passé.'}, status=400)
+
+    return {'type': appointment_type, 'start': appointment_date, 'end': appointment_date, 'range': False}
+
+
+def _slots_payload(request, query, days):
+    """Build the JSON body of the available slots API from the computed days."""
+    if query['range']:
+        return {
+            'from': request.GET['from'],
+            'to': request.GET['to'],
+            'type': query['type'],
+            'days': {day.isoformat(): info for day, info in days.items()},
+        }
+    return {
+        'date': request.GET['date'],
+        'type': query['type'],
+        'available_slots': days[query['start']]['available_slots'],
+    }
 
-        return JsonResponse({
-            'date': date_str,
-            'type': appointment_type,
-            'available_slots': available_slots
-        })
 
-    except ValueError as e:
-        logger.error(f"Invalid date format: {str(e)}")
-        return JsonResponse({'error': 'Format de date invalide. Utilisez YYYY-MM-DD.'}, status=400)
+def _available_slots_etag(request):
+    """ETag of get_available_slots from the per-day cache versions; None if the params are invalid."""
+    query = _slots_query(request)
+    if isinstance(query, JsonResponse) or query['type'] not in dict(Appointment.APPOINTMENT_TYPE_CHOICES):
+        return None
+    return availability_etag(query['type'], query['start'], query['end'])
+
+
+@ratelimit('slots')
+@require_http_methods(["GET"])
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_available_slots_etag)
+def get_available_slots(request):
+    """
+    API endpoint to get available time slots for an appointment type.
+    Query params:
+        type (formation|livrables)
+        date (YYYY-MM-DD) for a single day, or
+        from/to (YYYY-MM-DD) for a whole range (up to the 3-month booking window)
+    core/async_views.py has the version served under ASGI.
+    """
+    try:
+        query = _slots_query(request)
+        if isinstance(query, JsonResponse):
+            return query
+        days = get_availability_range(query['type'], query['start'], query['end']) if query['start'] <= query['end'] else {}
+        return JsonResponse(_slots_payload(request, query, days))
     except Exception as e:
-        logger.error(f"Error fetching available slots: {str(e)}")
+        logger.error("Error fetching available slots", extra={'error': str(e)})
         return JsonResponse({'error': 'Une erreur s\'est produite.'}, status=500)
 
 
+def _booking_form(request):
+    """
+    Return the validation-ready AppointmentForm of a booking API request, or the
+    JsonResponse (400) rejecting its appointment type.
+    """
+    appointment_type = request.POST.get('type')
+    if appointment_type not in dict(Appointment.APPOINTMENT_TYPE_CHOICES):
+        return JsonResponse({'error': 'Type de rendez-vous invalide.'}, status=400)
+    return AppointmentForm(request.POST, appointment_type=appointment_type)
+
+
+def _booking_errors(form):
+    return JsonResponse({'error': 'invalid', 'errors': form.errors.get_json_data()}, status=400)
+
+
+def _new_appointment(form, user):
+    appointment = form.save(commit=False)
+    appointment.appointment_type = form.appointment_type
+    if user is not None and user.is_authenticated:
+        appointment.user = user
+    return appointment
+
+
+def _booked(appointment):
+    logger.info("Appointment booked via API", extra={
+        'appointment_id': appointment.pk, 'appointment_type': appointment.appointment_type,
+        'appointment_date': appointment.appointment_date, 'appointment_time': appointment.appointment_time,
+    })
+    return JsonResponse({
+        'id': appointment.pk,
+        'type': appointment.appointment_type,
+        'date': appointment.appointment_date.isoformat(),
+        'time': appointment.appointment_time.strftime('%H:%M'),
+        'status': appointment.status,
+    }, status=201)
+
+
+@ratelimit('booking')
+@require_http_methods(["POST"])
+def book_appointment(request):
+    """
+    Booking API for the calendar and other JSON clients.
+    POST: type (formation|livrables) and the booking form fields.
+    201 with the appointment, 400 with the form errors, 409 with the nearest free slots.
+    core/async_views.py has the version served under ASGI.
+    """
+    form = _booking_form(request)
+    if isinstance(form, JsonResponse):
+        return form
+    if not form.is_valid():
+        return _booking_errors(form)
+    appointment = _new_appointment(form, request.user)
+    try:
+        reserve_appointment(appointment)
+    except SlotTaken as e:
+        return JsonResponse(e.as_dict(), status=409)
+    return _booked(appointment)
+
+
 # --- User appointments view ---
 
 from django.contrib.auth.decorators import login_required
 
+def _mes_rendez_vous_etag(request):
+    """
+    ETag of mes_rendez_vous: last change and count of the user's appointments, plus the
+    session and CSRF cookie the page was rendered for. None while flash messages are pending.
+    """
+    if not request.user.is_authenticated or len(get_messages(request)):
+        return None
+    state = Appointment.objects.filter(user=request.user).aggregate(last=Max('updated_at'), count=Count('pk'))
+    parts = [
+        str(request.user.pk),
+        request.COOKIES.get(settings.SESSION_COOKIE_NAME, ''),
+        request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+        state['last'].isoformat() if state['last'] else '',
+        str(state['count']),
+    ]
+    return hashlib.md5(':'.join(parts).encode()).hexdigest()
+
+
 @login_required(login_url='/connexion/')
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_mes_rendez_vous_etag)
 def mes_rendez_vous(request):
     """Show logged-in user's own appointments."""
     appointments = Appointment.objects.filter(user=request.user).order_by('-appointment_date', '-appointment_time')
@@ -227,14 +437,7 @@ def staff_required(view_func):
 
 # --- Authentication views ---
 
-def _get_client_ip(request):
-    """Extract the client IP address from the request."""
-    x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
-    if x_forwarded_for:
-        return x_forwarded_for.split(',')[0].strip()
-    return request.META.get('REMOTE_ADDR')
-
-
+@ratelimit('login', methods=['POST'])
 def connexion_view(request):
     """Handle user login with rate limiting. Staff users are redirected to dashboard."""
     if request.user.is_authenticated:
@@ -243,11 +446,8 @@ def connexion_view(request):
         return redirect('index')
 
     if request.method == 'POST':
-        ip = _get_client_ip(request)
-        cache_key = f'login_attempts_{ip}'
-        attempts = cache.get(cache_key, 0)
-
-        if attempts >= MAX_LOGIN_ATTEMPTS:
+        ip = client_ip(request)
+        if not LOGIN_FAILURES.remaining(ip):
             messages.error(request, "Trop de tentatives de connexion. Veuillez réessayer dans 5 minutes.")
             return render(request, 'core/connexion.html')
 
@@ -255,7 +455,7 @@ def connexion_view(request):
         password = request.POST.get('password')
         user = authenticate(request, username=username, password=password)
         if user is not None:
-            cache.delete(cache_key)
+            LOGIN_FAILURES.reset(ip)
             login(request, user)
             next_url = request.GET.get('next', '')
             if next_url and url_has_allowed_host_and_scheme(next_url, allowed_hosts={request.get_host()}):
@@ -264,8 +464,8 @@ def connexion_view(request):
                 return redirect('dashboard_home')
             return redirect('index')
         else:
-            cache.set(cache_key, attempts + 1, LOGIN_LOCKOUT_SECONDS)
-            remaining = MAX_LOGIN_ATTEMPTS - attempts - 1
+            LOGIN_FAILURES.hit(ip)
+            remaining = LOGIN_FAILURES.remaining(ip)
             if remaining > 0:
                 messages.error(request, f"Identifiants incorrects. {remaining} tentative(s) restante(s).")
             else:
@@ -285,16 +485,33 @@ def deconnexion_view(request):
 
 @staff_required
 def dashboard_home(request):
-    """Main dashboard page showing all appointments and stats."""
-    appointments = Appointment.objects.all().order_by('-appointment_date', '-appointment_time')
+    """
+    Main dashboard page showing stats and one keyset-paginated page of appointments.
+    Query params: type, status (filters), after/before (page cursors)
+    """
+    appointment_type = request.GET.get('type', '')
+    if appointment_type not in dict(Appointment.APPOINTMENT_TYPE_CHOICES):
+        appointment_type = ''
+    status = request.GET.get('status', '')
+    if status not in dict(Appointment.STATUS_CHOICES):
+        status = ''
+
+    filtered = Appointment.objects.all()
+    if appointment_type:
+        filtered = filtered.filter(appointment_type=appointment_type)
+    if status:
+        filtered = filtered.filter(status=status)
+
+    page = paginate_appointments(filtered, after=request.GET.get('after'), before=request.GET.get('before'))
+    filter_query = urlencode({key: value for key, value in (('type', appointment_type), ('status', status)) if value})
 
     context = {
-        'appointments': appointments,
-        'total_count': appointments.count(),
-        'pending_count': appointments.filter(status='pending').count(),
-        'confirmed_count': appointments.filter(status='confirmed').count(),
-        'formation_count': appointments.filter(appointment_type='formation').count(),
-        'livrables_count': appointments.filter(appointment_type='livrables').count(),
+        'appointments': page,
+        'page': page,
+        'current_type': appointment_type,
+        'current_status': status,
+        'filter_query': filter_query,
+        **get_dashboard_stats(),
     }
     return render(request, 'core/dashboard/dashboard_home.html', context)
 
@@ -308,32 +525,14 @@ def dashboard_send_email(request, pk):
     if request.method == 'POST':
         form = FollowUpEmailForm(request.POST)
         if form.is_valid():
-            try:
-                subject = form.cleaned_data['email_subject'].replace('\n', '').replace('\r', '')
-                body = form.cleaned_data['email_body']
-
-                send_mail(
-                    subject=subject,
-                    message=body,
-                    from_email=settings.DEFAULT_FROM_EMAIL,
-                    recipient_list=[appointment.email],
-                    fail_silently=False,
-                )
-
-                SentEmail.objects.create(
-                    appointment=appointment,
-                    subject=subject,
-                    body=body,
-                    recipient_email=appointment.email,
-                    sent_by=request.user,
-                )
-
-                messages.success(request, f"Email envoyé avec succès à {appointment.name} ({appointment.email})")
-                logger.info(f"Follow-up email sent to {appointment.email} by {request.user.username}")
-                return redirect('dashboard_home')
-            except Exception as e:
-                logger.error(f"Error sending email: {str(e)}")
-                messages.error(request, "Erreur lors de l'envoi de l'email. Veuillez réessayer.")
+            subject = form.cleaned_data['email_subject'].replace('\n', '').replace('\r', '')
+            body = form.cleaned_data['email_body']
+            # Delivered by the send_queued_emails worker, not inside the request
+            queue_email(appointment, subject, body, sent_by=request.user)
+
+            messages.success(request, f"Email programmé pour {appointment.name} ({appointment.email})")
+            logger.info("Follow-up email queued", extra={'appointment_id': appointment.pk, 'username': request.user.username})
+            return redirect('dashboard_home')
     else:
         form = FollowUpEmailForm(initial={
             'email_subject': f"Suite à votre rendez-vous - Gourmelon BTP",
@@ -346,25 +545,147 @@ def dashboard_send_email(request, pk):
     })
 
 
+@staff_required
+def dashboard_bulk_email(request):
+    """Queue a templated follow-up email to every appointment matching a filter."""
+    if request.method == 'POST':
+        form = BulkEmailForm(request.POST)
+        if form.is_valid():
+            count = queue_bulk_emails(
+                form.appointments(),
+                form.cleaned_data['email_subject'],
+                form.cleaned_data['email_body'],
+                sent_by=request.user,
+            )
+            if count:
+                messages.success(request, f"{count} email(s) programmé(s).")
+                logger.info("Bulk follow-up emails queued", extra={'count': count, 'username': request.user.username})
+                return redirect('dashboard_home')
+            form.add_error(None, "Aucun rendez-vous ne correspond à ces filtres.")
+    else:
+        # Pre-filled from the dashboard's current filters
+        form = BulkEmailForm(initial={
+            'appointment_type': request.GET.get('type', ''),
+            'status': request.GET.get('status', ''),
+            'email_subject': "Suite à votre rendez-vous - Gourmelon BTP",
+            'email_body': "Bonjour {{ nom }},\n\n",
+        })
+
+    return render(request, 'core/dashboard/bulk_email.html', {'form': form})
+
+
+def _describe(appointments):
+    return ", ".join(
+        f"{a.name} ({a.appointment_date:%d/%m/%Y} à {a.appointment_time:%H:%M})" for a in appointments
+    )
+
+
 @staff_required
 @require_http_methods(["POST"])
 def dashboard_update_status(request, pk):
     """Update the status of an appointment."""
-    appointment = get_object_or_404(Appointment, pk=pk)
+    get_object_or_404(Appointment, pk=pk)
     new_status = request.POST.get('status')
-    valid_statuses = dict(Appointment.STATUS_CHOICES)
 
-    if new_status in valid_statuses:
-        Appointment.objects.filter(pk=pk).update(status=new_status)
-        appointment.refresh_from_db()
-        messages.success(request, f"Statut mis à jour : {appointment.get_status_display()}")
-        logger.info(f"Appointment {pk} status updated to {new_status} by {request.user.username}")
+    if new_status in dict(Appointment.STATUS_CHOICES):
+        try:
+            update_status(Appointment.objects.filter(pk=pk), new_status, request.user)
+        except StatusConflict as e:
+            messages.error(request, f"Ce créneau chevauche un rendez-vous actif : {_describe(e.appointments)}.")
+            return redirect('dashboard_home')
+        except IntegrityError:
+            messages.error(request, "Ce créneau est déjà occupé par un autre rendez-vous actif.")
+            return redirect('dashboard_home')
+        messages.success(request, f"Statut mis à jour : {dict(Appointment.STATUS_CHOICES)[new_status]}")
+        logger.info("Appointment status updated", extra={'appointment_id': pk, 'status': new_status, 'username': request.user.username})
     else:
         messages.error(request, "Statut invalide.")
 
     return redirect('dashboard_home')
 
 
+@staff_required
+@require_http_methods(["POST"])
+def dashboard_bulk_status(request):
+    """
+    Update the status of many appointments at once.
+    POST: status, and either ids (selected rows) or all=1 with filter_type/filter_status
+    (every appointment matching the dashboard filter)
+    """
+    new_status = request.POST.get('status')
+    filter_type = request.POST.get('filter_type', '')
+    filter_status = request.POST.get('filter_status', '')
+    filter_query = urlencode({key: value for key, value in (('type', filter_type), ('status', filter_status)) if value})
+    back = reverse('dashboard_home') + (f'?{filter_query}' if filter_query else '')
+
+    if new_status not in dict(Appointment.STATUS_CHOICES):
+        messages.error(request, "Statut invalide.")
+        return redirect(back)
+
+    if request.POST.get('all') == '1':
+        selected = Appointment.objects.all()
+        if filter_type in dict(Appointment.APPOINTMENT_TYPE_CHOICES):
+            selected = selected.filter(appointment_type=filter_type)
+        if filter_status in dict(Appointment.STATUS_CHOICES):
+            selected = selected.filter(status=filter_status)
+    else:
+        ids = [int(pk) for pk in request.POST.getlist('ids') if pk.isdigit()]
+        if not ids:
+            messages.error(request, "Aucun rendez-vous sélectionné.")
+            return redirect(back)
+        selected = Appointment.objects.filter(pk__in=ids)
+
+    try:
+        count = update_status(selected, new_status, request.user)
+    except StatusConflict as e:
+        messages.error(request, f"Ces rendez-vous chevauchent un rendez-vous actif, aucun statut modifié : {_describe(e.appointments)}.")
+        return redirect(back)
+    except IntegrityError:
+        messages.error(request, "Un des créneaux est déjà occupé par un autre rendez-vous actif : aucun statut modifié.")
+        return redirect(back)
+
+    messages.success(request, f"{count} rendez-vous passé(s) en « {dict(Appointment.STATUS_CHOICES)[new_status]} ».")
+    logger.info("Appointment statuses updated", extra={'count': count, 'status': new_status, 'username': request.user.username})
+    return redirect(back)
+
+
+@staff_required
+@require_http_methods(["GET"])
+def dashboard_export(request, kind):
+    """
+    Stream a CSV export of appointments, contact messages or sent emails.
+    Query params: type, status (as on the dashboard), from/to (YYYY-MM-DD)
+    """
+    if kind not in EXPORTS:
+        raise Http404("Export inconnu")
+    logger.info("Export downloaded", extra={'kind': kind, 'username': request.user.username})
+    return csv_response(kind, request.GET)
+
+
+# --- Monitoring ---
+
+def _metrics_allowed(request):
+    if request.user.is_staff:
+        return True
+    if client_ip(request) in settings.METRICS_ALLOWED_IPS:
+        return True
+    token = settings.METRICS_TOKEN
+    return bool(token) and hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {token}')
+
+
+@require_http_methods(["GET"])
+def metrics(request):
+    """
+    Request metrics of every worker in the Prometheus text format (core/metrics.py).
+    Staff users, settings.METRICS_ALLOWED_IPS and the METRICS_TOKEN bearer only.
+    """
+    if not _metrics_allowed(request):
+        return HttpResponse("Accès non autorisé.", status=403, content_type='text/plain; charset=utf-8')
+    response = HttpResponse(render_metrics(collect_metrics()), content_type='text/plain; version=0.0.4; charset=utf-8')
+    response['Cache-Control'] = 'no-store'
+    return response
+
+
 # --- Password change views ---
 
 class StaffRequiredMixin(LoginRequiredMixin, UserPassesTestMixin):